@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
@@ -8,7 +8,12 @@ from app.services.data_service import DataService
 from app.services.financial_service import FinancialService
 from app.services.news_service import NewsService
 from app.services.company_service import CompanyService
+from app.services.company_cache import company_cache
+from app.services.response_cache import response_cache
+from app.services.sentiment_cache import sentiment_cache
+from app.services.news_backfill import backfill_jobs, run_news_backfill
 from app.schemas.company import CompanyCreate
+from app.schemas.news import NewsBackfillRequest
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -106,16 +111,26 @@ async def fetch_company_data_sync(
 @router.get("/financial/{ticker}")
 async def get_financial_data(
     ticker: str,
+    request: Request,
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db)
 ):
     """Get financial data for a company"""
     try:
+        company = company_cache.get(db, ticker)
+        if not company:
+            raise HTTPException(status_code=404, detail="Financial data not found")
+        
+        cache_key = response_cache.key("financial_data", company.id, days=days)
+        cached = response_cache.cached(request, cache_key)
+        if cached:
+            return cached
+        
         financial_service = FinancialService(db)
         data = financial_service.get_financial_data(ticker, days=days)
         if not data:
             raise HTTPException(status_code=404, detail="Financial data not found")
-        return data
+        return response_cache.store(request, cache_key, data)
     except HTTPException:
         raise
     except Exception as e:
@@ -188,6 +203,45 @@ async def refresh_news_data(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/news/{ticker}/backfill")
+async def backfill_news_data(
+    ticker: str,
+    request: NewsBackfillRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """Backfill historical articles for a company through the sentiment worker pool"""
+    try:
+        company = company_cache.get(db, ticker)
+        if not company:
+            raise HTTPException(status_code=404, detail="Company not found")
+        
+        articles = [article.model_dump() for article in request.articles]
+        job_id = backfill_jobs.create(company.ticker, len(articles))
+        background_tasks.add_task(run_news_backfill, job_id, company.ticker, articles)
+        
+        return {
+            "message": f"News backfill initiated for {company.ticker}",
+            "job_id": job_id,
+            "articles_total": len(articles),
+            "status": "processing"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting news backfill for {ticker}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/news/backfill/{job_id}")
+async def get_news_backfill_status(job_id: str):
+    """Get progress of a news backfill started on this worker process"""
+    job = backfill_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return job
+
+
 @router.get("/status/{ticker}")
 async def get_data_status(ticker: str, db: Session = Depends(get_db)):
     """Get data freshness status for a company"""
@@ -220,5 +274,7 @@ async def refresh_all_data(background_tasks: BackgroundTasks, db: Session = Depe
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-
-
+@router.get("/metrics/sentiment-cache")
+async def get_sentiment_cache_metrics():
+    """Get sentiment cache hit ratio and size for this worker process"""
+    return sentiment_cache.get_stats()
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
 
 from app.core.database import get_db
 from app.services.scoring_service import ScoringService
+from app.services.batch_scoring_service import BatchScoringService
+from app.services.company_cache import company_cache
+from app.services.response_cache import response_cache
 from app.schemas.scoring import CreditScoreResponse, ScoreExplanation
 
 logger = logging.getLogger(__name__)
@@ -36,11 +39,20 @@ async def compute_credit_score(
 @router.get("/score/{ticker}", response_model=CreditScoreResponse)
 async def get_credit_score(
     ticker: str,
+    request: Request,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Get latest credit score for a company (auto-compute if not exists)"""
     try:
+        # Serve unchanged scores from the response cache
+        company = company_cache.get(db, ticker)
+        cache_key = response_cache.key("score", company.id) if company else None
+        if cache_key:
+            cached = response_cache.cached(request, cache_key)
+            if cached:
+                return cached
+        
         scoring_service = ScoringService(db)
         score = scoring_service.get_latest_credit_score(ticker)
         
@@ -50,7 +62,6 @@ async def get_credit_score(
             try:
                 # Check if we have the required data first
                 has_financial_data = scoring_service._get_latest_financial_data(ticker) is not None
-                has_news_data = scoring_service._get_latest_news_data(ticker) is not None
                 
                 if not has_financial_data:
                     raise HTTPException(
@@ -79,6 +90,8 @@ async def get_credit_score(
                     detail=f"Error computing credit score for {ticker}: {str(e)}"
                 )
         
+        if cache_key:
+            return response_cache.store(request, cache_key, CreditScoreResponse(**score))
         return score
     except HTTPException:
         raise
@@ -90,16 +103,26 @@ async def get_credit_score(
 @router.get("/scores/{ticker}/history")
 async def get_credit_score_history(
     ticker: str,
+    request: Request,
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db)
 ):
     """Get credit score history for a company"""
     try:
+        company = company_cache.get(db, ticker)
+        if not company:
+            raise HTTPException(status_code=404, detail="Credit score history not found")
+        
+        cache_key = response_cache.key("score_history", company.id, days=days)
+        cached = response_cache.cached(request, cache_key)
+        if cached:
+            return cached
+        
         scoring_service = ScoringService(db)
         history = scoring_service.get_credit_score_history(ticker, days=days)
         if not history:
             raise HTTPException(status_code=404, detail="Credit score history not found")
-        return history
+        return response_cache.store(request, cache_key, history)
     except HTTPException:
         raise
     except Exception as e:
@@ -110,15 +133,25 @@ async def get_credit_score_history(
 @router.get("/explanation/{ticker}", response_model=ScoreExplanation)
 async def get_score_explanation(
     ticker: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Get detailed explanation for latest credit score"""
     try:
+        company = company_cache.get(db, ticker)
+        if not company:
+            raise HTTPException(status_code=404, detail="Score explanation not found")
+        
+        cache_key = response_cache.key("score_explanation", company.id)
+        cached = response_cache.cached(request, cache_key)
+        if cached:
+            return cached
+        
         scoring_service = ScoringService(db)
         explanation = scoring_service.get_score_explanation(ticker)
         if not explanation:
             raise HTTPException(status_code=404, detail="Score explanation not found")
-        return explanation
+        return response_cache.store(request, cache_key, ScoreExplanation(**explanation))
     except HTTPException:
         raise
     except Exception as e:
@@ -172,8 +205,8 @@ async def compute_all_credit_scores(
 ):
     """Compute credit scores for all active companies"""
     try:
-        scoring_service = ScoringService(db)
-        result = await scoring_service.compute_all_credit_scores(background_tasks)
+        batch_scoring_service = BatchScoringService(db)
+        result = await batch_scoring_service.compute_all_credit_scores(background_tasks)
         return {
             "message": "Credit score computation initiated for all companies",
             "companies_count": result["companies_count"],
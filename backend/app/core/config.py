@@ -28,14 +28,80 @@ class Settings(BaseSettings):
     max_retries: int = int(os.getenv("MAX_RETRIES", "3"))
     retry_delay: int = int(os.getenv("RETRY_DELAY", "5"))
     
+    # Refresh Engine Settings
+    financial_fetch_concurrency: int = int(os.getenv("FINANCIAL_FETCH_CONCURRENCY", "8"))
+    news_fetch_concurrency: int = int(os.getenv("NEWS_FETCH_CONCURRENCY", "4"))
+    ticker_fetch_timeout: int = int(os.getenv("TICKER_FETCH_TIMEOUT", "60"))  # seconds per ticker, news only
+    
+    # HTTP Client Settings
+    http_timeout: float = float(os.getenv("HTTP_TIMEOUT", "30"))  # seconds
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    http_max_keepalive_connections: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    http_keepalive_expiry: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # seconds
+    blocking_io_workers: int = int(os.getenv("BLOCKING_IO_WORKERS", "16"))
+    
+    # Bulk Market Data Settings
+    bulk_download_chunk_size: int = int(os.getenv("BULK_DOWNLOAD_CHUNK_SIZE", "200"))
+    bulk_fetch_timeout: int = int(os.getenv("BULK_FETCH_TIMEOUT", "300"))  # seconds per chunk
+    fundamentals_ttl: int = int(os.getenv("FUNDAMENTALS_TTL", "86400"))  # 24 hours
+    market_data_cache_size: int = int(os.getenv("MARKET_DATA_CACHE_SIZE", "5000"))  # tickers held in memory
+    price_history_dir: str = os.getenv("PRICE_HISTORY_DIR", "./price_history")  # empty disables saving bars
+    
+    # Sentiment Cache Settings
+    sentiment_cache_size: int = int(os.getenv("SENTIMENT_CACHE_SIZE", "10000"))
+    sentiment_cache_retention_days: int = int(os.getenv("SENTIMENT_CACHE_RETENTION_DAYS", "30"))
+    
+    # Company Cache Settings
+    company_cache_ttl: int = int(os.getenv("COMPANY_CACHE_TTL", "300"))  # seconds
+    
+    # Response Cache Settings
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "2000"))
+    response_cache_ttl: int = int(os.getenv("RESPONSE_CACHE_TTL", "300"))  # seconds
+    
+    # News Window Settings
+    news_window_resync_seconds: int = int(os.getenv("NEWS_WINDOW_RESYNC_SECONDS", "3600"))
+    
+    # News Deduplication Settings
+    news_dedup_window_days: int = int(os.getenv("NEWS_DEDUP_WINDOW_DAYS", "7"))
+    
+    # News Backfill Settings
+    news_backfill_workers: int = int(os.getenv("NEWS_BACKFILL_WORKERS", "0"))  # 0 = one per CPU
+    news_backfill_chunk_size: int = int(os.getenv("NEWS_BACKFILL_CHUNK_SIZE", "500"))
+    
+    # Query Audit Settings
+    query_audit_on_startup: bool = os.getenv("QUERY_AUDIT_ON_STARTUP", "False").lower() == "true"
+    
     # Scoring Model Weights
     financial_weight: float = float(os.getenv("FINANCIAL_WEIGHT", "0.4"))
     market_weight: float = float(os.getenv("MARKET_WEIGHT", "0.3"))
     news_weight: float = float(os.getenv("NEWS_WEIGHT", "0.3"))
     
+    # Scoring Engine Settings
+    scoring_engine: str = os.getenv("SCORING_ENGINE", "weighted_average")  # xgboost also records the distress model
+    model_dir: str = os.getenv("MODEL_DIR", "./models")
+    model_version: str = os.getenv("MODEL_VERSION", "")
+    
     # Alert Settings
     score_change_threshold: float = float(os.getenv("SCORE_CHANGE_THRESHOLD", "20.0"))
     alert_time_window: int = int(os.getenv("ALERT_TIME_WINDOW", "86400"))  # 24 hours
+    alert_cleanup_chunk_size: int = int(os.getenv("ALERT_CLEANUP_CHUNK_SIZE", "5000"))  # expired alerts deleted per transaction
+    
+    # Retention Settings (days kept per table; 0 keeps everything)
+    financial_data_retention_days: int = int(os.getenv("FINANCIAL_DATA_RETENTION_DAYS", "90"))
+    news_retention_days: int = int(os.getenv("NEWS_RETENTION_DAYS", "90"))
+    credit_score_retention_days: int = int(os.getenv("CREDIT_SCORE_RETENTION_DAYS", "30"))
+    retention_batch_size: int = int(os.getenv("RETENTION_BATCH_SIZE", "5000"))  # rows deleted per transaction
+    retention_batch_pause: float = float(os.getenv("RETENTION_BATCH_PAUSE", "0.05"))  # seconds between batches
+    retention_vacuum: bool = os.getenv("RETENTION_VACUUM", "True").lower() == "true"
+    
+    # Archive Settings (Parquet copies of rows before retention deletes them; needs pyarrow)
+    archive_enabled: bool = os.getenv("ARCHIVE_ENABLED", "False").lower() == "true"
+    archive_dir: str = os.getenv("ARCHIVE_DIR", "./archive")
+    archive_compression: str = os.getenv("ARCHIVE_COMPRESSION", "zstd")
+    
+    # Partitioning Settings (PostgreSQL only; applies when the tables are first created)
+    time_partitioning: bool = os.getenv("TIME_PARTITIONING", "False").lower() == "true"
+    partition_months_ahead: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
     
     # CORS Settings
     cors_origins: list = ["*"]  # Configure appropriately for production
@@ -43,6 +109,7 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = False
+        protected_namespaces = ()  # model_dir and model_version are settings, not pydantic internals
 
 
 # Create settings instance
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -19,6 +20,14 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+# Monthly range partitions for the time-series tables; SQLite keeps plain tables
+TIME_PARTITIONING = settings.time_partitioning and engine.dialect.name == "postgresql"
+
+
+def partition_options(column: str) -> dict:
+    """Table options partitioning a table by month on a timestamp column when partitioning is enabled"""
+    return {"postgresql_partition_by": f"RANGE ({column})"} if TIME_PARTITIONING else {}
+
 
 def get_db():
     """Dependency to get database session"""
@@ -29,10 +38,83 @@ def get_db():
         db.close()
 
 
+def dialect_insert(model):
+    """Build an INSERT for the active dialect so ON CONFLICT clauses are available"""
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def _deduplicate_news_events():
+    """Hash articles stored before url_hash existed and drop their duplicates so the unique index can be built"""
+    # Models import Base from this module
+    from app.models.news_event import DEDUP_COLUMNS, article_url_hash
+    
+    hashed = 0
+    with engine.begin() as connection:
+        while True:
+            rows = connection.execute(text(
+                "SELECT id, url, headline, source FROM news_events WHERE url_hash IS NULL ORDER BY id LIMIT 5000"
+            )).all()
+            if not rows:
+                break
+            
+            connection.execute(
+                text("UPDATE news_events SET url_hash = :url_hash WHERE id = :id"),
+                [{"id": row.id, "url_hash": article_url_hash(row.url, row.headline, row.source)} for row in rows]
+            )
+            hashed += len(rows)
+        
+        # The first stored copy of each article is kept
+        removed = connection.execute(text(
+            f"DELETE FROM news_events WHERE id NOT IN "
+            f"(SELECT MIN(id) FROM news_events GROUP BY {', '.join(DEDUP_COLUMNS)})"
+        )).rowcount
+    
+    logger.info(f"Backfilled url_hash for {hashed} news events and removed {removed} duplicates")
+
+
+# One-time data fixes run before an index is first created on an existing table
+INDEX_PREPARATION = {
+    "uq_news_events_company_url_hash": _deduplicate_news_events
+}
+
+
+def upgrade_schema():
+    """Add columns and indexes declared on models but missing from existing tables"""
+    inspector = inspect(engine)
+    
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        with engine.begin() as connection:
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                if not column.nullable or column.primary_key:
+                    logger.warning(f"Cannot add non-nullable column {table.name}.{column.name} automatically")
+                    continue
+                
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+        
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                if index.name in INDEX_PREPARATION:
+                    INDEX_PREPARATION[index.name]()
+                index.create(bind=engine)
+                logger.info(f"Created index {index.name}")
+
+
 def init_db():
     """Initialize database tables"""
     try:
         Base.metadata.create_all(bind=engine)
+        upgrade_schema()
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
@@ -0,0 +1,28 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+from typing import Any, Callable
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Thread pool for blocking client libraries (e.g. yfinance) so they never
+# run on the event loop thread
+blocking_executor = ThreadPoolExecutor(
+    max_workers=settings.blocking_io_workers,
+    thread_name_prefix="blocking-io"
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on the shared thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_blocking_executor():
+    """Shut down the blocking I/O thread pool"""
+    blocking_executor.shutdown(wait=False, cancel_futures=True)
+    logger.info("Blocking I/O executor shut down")
@@ -0,0 +1,80 @@
+import asyncio
+import httpx
+import requests
+from typing import Any, Awaitable, Callable, Dict, Optional
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared client instance
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client, creating it on first use"""
+    global _client
+    
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.http_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry
+            )
+        )
+    
+    return _client
+
+
+async def close_http_client():
+    """Close the shared async HTTP client and its connection pool"""
+    global _client
+    
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("HTTP client closed")
+    
+    _client = None
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Check whether a failed request is worth retrying: rate limits, upstream 5xx and network errors"""
+    # httpx for our own API calls, requests for the calls yfinance makes
+    if isinstance(error, (httpx.HTTPStatusError, requests.HTTPError)) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (
+        httpx.TransportError, requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError
+    ))
+
+
+async def retry_async(operation: Callable[[], Awaitable[Any]], description: str,
+                      retryable: Callable[[Exception], bool] = is_retryable_error) -> Any:
+    """Run an async operation, retrying with exponential backoff on failure"""
+    for attempt in range(settings.max_retries + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt >= settings.max_retries or not retryable(e):
+                raise
+            
+            delay = settings.retry_delay * (2 ** attempt)
+            logger.warning(f"{description} failed (attempt {attempt + 1}/{settings.max_retries + 1}): {e}; "
+                           f"retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+
+async def get_json(url: str, params: Optional[Dict[str, Any]] = None,
+                   headers: Optional[Dict[str, str]] = None) -> Any:
+    """GET a JSON document through the shared client with retries"""
+    async def _get():
+        response = await get_http_client().get(url, params=params, headers=headers)
+        response.raise_for_status()
+        return response.json()
+    
+    return await retry_async(_get, f"GET {url}", retryable=is_retryable_error)
@@ -0,0 +1,92 @@
+import re
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# Below this many keywords a substring check per keyword (C-speed `in`) beats the
+# trie regex; the regex scan only pays off once the vocabulary is large
+TRIE_MIN_KEYWORDS = 256
+
+
+def _trie_pattern(keywords: Sequence[str]) -> str:
+    """Regex alternation over a character trie of the keywords"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A keyword ends here: the longer continuations are optional and tried first
+        return '(?:' + body + ')?' if '' in node else body
+    
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Finds the keywords occurring as substrings of a text, with one trie regex scan for large vocabularies"""
+    
+    def __init__(self, keywords_by_label: Dict[str, Sequence[str]], trie_min_keywords: int = TRIE_MIN_KEYWORDS):
+        self.keywords_by_label = {
+            label: [keyword for keyword in keywords if keyword] for label, keywords in keywords_by_label.items()
+        }
+        keywords = sorted({keyword for group in self.keywords_by_label.values() for keyword in group})
+        self.keywords = keywords
+        
+        # Trie branches start with distinct characters, so a match is the longest keyword at its offset
+        self.pattern: Optional[re.Pattern] = (
+            re.compile(_trie_pattern(keywords)) if len(keywords) >= trie_min_keywords else None
+        )
+        
+        # Shorter keywords starting at the same offset are prefixes of the matched one
+        self.prefixes = {
+            keyword: [other for other in keywords if keyword.startswith(other)]
+            for keyword in keywords
+        }
+    
+    def find(self, text: str) -> Set[str]:
+        """All keywords that occur in a lowercased text, overlapping ones included"""
+        if self.pattern is None:
+            return {keyword for keyword in self.keywords if keyword in text}
+        
+        found = set()
+        search = self.pattern.search
+        match = search(text)
+        
+        while match:
+            found.update(self.prefixes[match.group()])
+            match = search(text, match.start() + 1)
+        
+        return found
+    
+    def match(self, text: str) -> Tuple[List[str], List[str]]:
+        """Labels with a keyword in the text, and the first keyword (in list order) found for each"""
+        labels = []
+        keywords = []
+        
+        if self.pattern is None:
+            # Small vocabulary: stop at each label's first keyword instead of testing them all
+            for label, group in self.keywords_by_label.items():
+                for keyword in group:
+                    if keyword in text:
+                        labels.append(label)
+                        keywords.append(keyword)
+                        break
+            return labels, keywords
+        
+        found = self.find(text)
+        if not found:
+            return labels, keywords
+        
+        for label, group in self.keywords_by_label.items():
+            for keyword in group:
+                if keyword in found:
+                    labels.append(label)
+                    keywords.append(keyword)
+                    break
+        
+        return labels, keywords
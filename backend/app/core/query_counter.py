@@ -0,0 +1,43 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import List, Optional
+import logging
+
+from app.core.database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Context manager counting the SQL statements an engine executes inside the block"""
+    
+    def __init__(self, engine: Optional[Engine] = None):
+        self.engine = engine or default_engine
+        self.statements: List[str] = []
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+    
+    def __enter__(self) -> "QueryCounter":
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        return False
+    
+    def assert_count(self, expected: int):
+        """Fail when the block ran a different number of statements than expected"""
+        if self.count != expected:
+            executed = '\n'.join(' '.join(statement.split()) for statement in self.statements)
+            raise AssertionError(f"Expected {expected} queries, executed {self.count}:\n{executed}")
+
+
+def count_queries(engine: Optional[Engine] = None) -> QueryCounter:
+    """Count the queries executed in a with-block, e.g. to pin a read path's query budget"""
+    return QueryCounter(engine)
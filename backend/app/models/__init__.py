@@ -2,14 +2,20 @@ from .company import Company
 from .financial_data import FinancialData
 from .news_event import NewsEvent
 from .credit_score import CreditScore
+from .latest_credit_score import LatestCreditScore
 from .alert import Alert
+from .sentiment_cache import SentimentCacheEntry
+from .score_dirty_company import ScoreDirtyCompany
 
 __all__ = [
     "Company",
     "FinancialData", 
     "NewsEvent",
     "CreditScore",
-    "Alert"
+    "LatestCreditScore",
+    "Alert",
+    "SentimentCacheEntry",
+    "ScoreDirtyCompany"
 ]
 
 
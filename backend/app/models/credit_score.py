@@ -1,15 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.core.database import Base
+from app.core.database import Base, TIME_PARTITIONING, partition_options
 
 
 class CreditScore(Base):
     """Credit score model for storing computed credit scores with explanations"""
     
     __tablename__ = "credit_scores"
+    __table_args__ = (
+        Index("ix_credit_scores_company_calculated_at", "company_id", "calculated_at"),
+        partition_options("calculated_at"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     
     # Score components
@@ -38,12 +42,15 @@ class CreditScore(Base):
     confidence_level = Column(Float)  # Model confidence (0-1)
     
     # Timestamps
-    calculated_at = Column(DateTime(timezone=True), server_default=func.now())
+    calculated_at = Column(DateTime(timezone=True), server_default=func.now(), primary_key=TIME_PARTITIONING)
     valid_until = Column(DateTime)  # When score expires
     
     # Relationships
     company = relationship("Company", back_populates="credit_scores")
     
+    # Rows are identified by id alone, partitioned or not
+    __mapper_args__ = {"primary_key": [id]}
+    
     def __repr__(self):
         return f"<CreditScore(company_id={self.company_id}, score={self.overall_score})>"
 
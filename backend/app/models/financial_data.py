@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -8,6 +8,9 @@ class FinancialData(Base):
     """Financial data model for storing structured financial metrics"""
     
     __tablename__ = "financial_data"
+    __table_args__ = (
+        Index("ix_financial_data_company_date", "company_id", "date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
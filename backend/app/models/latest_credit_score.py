@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
+from app.core.database import Base, TIME_PARTITIONING
+
+
+class LatestCreditScore(Base):
+    """Projection of the most recent credit score per company, maintained on every score write"""
+    
+    __tablename__ = "latest_credit_scores"
+    __table_args__ = (
+        Index("ix_latest_credit_scores_overall_score", "overall_score", "company_id"),
+    )
+    
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    # A partitioned credit_scores table has no unique key on id alone for a foreign key to reference
+    credit_score_id = Column(
+        Integer, *([] if TIME_PARTITIONING else [ForeignKey("credit_scores.id")]), nullable=False
+    )
+    
+    # Leaderboard fields copied from the credit score
+    overall_score = Column(Float, nullable=False)
+    score_change = Column(Float)
+    trend_direction = Column(String(20))
+    calculated_at = Column(DateTime(timezone=True), nullable=False)
+    
+    def __repr__(self):
+        return f"<LatestCreditScore(company_id={self.company_id}, score={self.overall_score})>"
@@ -1,15 +1,34 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, JSON
+import hashlib
+from typing import Optional
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.core.database import Base
+from app.core.database import Base, TIME_PARTITIONING, partition_options
+
+# Deduplication key; unique indexes on a partitioned table must include the partition key
+DEDUP_COLUMNS = ["company_id", "url_hash"] + (["published_at"] if TIME_PARTITIONING else [])
+
+
+def article_url_hash(url: Optional[str], headline: Optional[str], source: Optional[str]) -> str:
+    """Stable article identity: the URL, or headline and source when there is none"""
+    identity = (url or '').strip()
+    if not identity:
+        identity = f"{headline or ''}|{source or ''}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
 
 
 class NewsEvent(Base):
     """News event model for storing news headlines with sentiment analysis"""
     
     __tablename__ = "news_events"
+    __table_args__ = (
+        # One row per article per company
+        Index("uq_news_events_company_url_hash", *DEDUP_COLUMNS, unique=True),
+        Index("ix_news_events_company_published_at", "company_id", "published_at"),
+        partition_options("published_at"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     
     # News content
@@ -17,8 +36,9 @@ class NewsEvent(Base):
     summary = Column(Text)
     content = Column(Text)
     url = Column(String(500))
+    url_hash = Column(String(64))  # SHA-256 of the article URL, used for deduplication
     source = Column(String(100))
-    published_at = Column(DateTime)
+    published_at = Column(DateTime, primary_key=TIME_PARTITIONING)  # partition key joins the primary key when partitioned
     
     # Sentiment analysis
     sentiment_score = Column(Float)  # VADER compound score (-1 to 1)
@@ -43,6 +63,9 @@ class NewsEvent(Base):
     # Relationships
     company = relationship("Company", back_populates="news_events")
     
+    # Rows are identified by id alone, partitioned or not
+    __mapper_args__ = {"primary_key": [id]}
+    
     def __repr__(self):
         return f"<NewsEvent(company_id={self.company_id}, headline='{self.headline[:50]}...')>"
 
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from app.core.database import Base
+
+
+class ScoreDirtyCompany(Base):
+    """Companies whose scoring inputs changed since their last credit score"""
+    
+    __tablename__ = "score_dirty_companies"
+    
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    marked_at = Column(DateTime, nullable=False)  # Latest input change
+    
+    def __repr__(self):
+        return f"<ScoreDirtyCompany(company_id={self.company_id}, marked_at={self.marked_at})>"
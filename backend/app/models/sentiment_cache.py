@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, DateTime, Float, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SentimentCacheEntry(Base):
+    """Cached sentiment and event classification results keyed by normalized text hash"""
+    
+    __tablename__ = "sentiment_cache"
+    
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of analysis version + normalized text
+    analysis_version = Column(String(16), index=True)  # Analyzer setup that produced the result
+    
+    # Sentiment analysis
+    sentiment_score = Column(Float)
+    sentiment_label = Column(String(20))
+    positive_score = Column(Float)
+    negative_score = Column(Float)
+    neutral_score = Column(Float)
+    
+    # Event classification
+    event_type = Column(String(50))
+    event_confidence = Column(Float)
+    keywords = Column(JSON)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<SentimentCacheEntry(content_hash='{self.content_hash[:12]}...', label='{self.sentiment_label}')>"
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+
+
+class NewsArticle(BaseModel):
+    """News article in NewsAPI format"""
+    title: str = Field(..., min_length=1)
+    description: Optional[str] = None
+    content: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[Dict[str, Any]] = None
+    publishedAt: str = Field(..., description="ISO 8601 publication time")
+
+
+class NewsBackfillRequest(BaseModel):
+    """Historical articles to analyze and store for a company"""
+    articles: List[NewsArticle] = Field(..., min_length=1)
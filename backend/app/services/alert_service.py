@@ -1,5 +1,7 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, contains_eager
+from typing import List, Optional, Dict, Any, Sequence
 import logging
 from datetime import datetime, timedelta
 
@@ -7,9 +9,13 @@ from app.models.alert import Alert
 from app.models.company import Company
 from app.models.credit_score import CreditScore
 from app.core.config import settings
+from app.services.company_cache import CompanyRef, company_cache
 
 logger = logging.getLogger(__name__)
 
+# News event types that always raise an alert
+HIGH_RISK_NEWS_EVENTS = ['default', 'legal', 'restructuring']
+
 
 class AlertService:
     """Service for managing system alerts and notifications"""
@@ -23,7 +29,8 @@ class AlertService:
                    unread_only: bool = False, limit: int = 50) -> List[Dict[str, Any]]:
         """Get system alerts with optional filtering"""
         try:
-            query = self.db.query(Alert).join(Company)
+            # Populate alert.company from the join instead of one lazy load per alert
+            query = self.db.query(Alert).join(Alert.company).options(contains_eager(Alert.company))
             
             if ticker:
                 query = query.filter(Company.ticker == ticker.upper())
@@ -45,10 +52,7 @@ class AlertService:
     def get_company_alerts(self, ticker: str, days: int = 7, severity: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get alerts for a specific company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return []
@@ -64,7 +68,7 @@ class AlertService:
             
             alerts = query.order_by(Alert.created_at.desc()).all()
             
-            return [self._format_alert(alert) for alert in alerts]
+            return [self._format_alert(alert, company) for alert in alerts]
             
         except Exception as e:
             logger.error(f"Error getting company alerts for {ticker}: {e}")
@@ -151,46 +155,15 @@ class AlertService:
     def create_score_change_alert(self, company_id: int, previous_score: float, current_score: float) -> Optional[Alert]:
         """Create alert for significant score changes"""
         try:
-            score_change = current_score - previous_score
-            change_percentage = (score_change / previous_score) * 100 if previous_score > 0 else 0
-            
-            # Check if change exceeds threshold
-            if abs(score_change) < self.score_change_threshold:
+            rows = self.evaluate_score_changes([company_id], [previous_score], [current_score])
+            if not rows:
                 return None
             
-            # Determine severity
-            if abs(score_change) >= 30:
-                severity = "critical"
-            elif abs(score_change) >= 20:
-                severity = "high"
-            elif abs(score_change) >= 10:
-                severity = "medium"
-            else:
-                severity = "low"
-            
-            # Create alert
-            alert = Alert(
-                company_id=company_id,
-                alert_type="score_change",
-                severity=severity,
-                title=f"Credit Score Change Alert",
-                message=f"Credit score changed by {score_change:+.1f} points ({change_percentage:+.1f}%)",
-                score_change=score_change,
-                previous_score=previous_score,
-                current_score=current_score,
-                change_percentage=change_percentage,
-                trigger_value=score_change,
-                threshold_value=self.score_change_threshold,
-                context_data={
-                    'change_direction': 'increase' if score_change > 0 else 'decrease',
-                    'change_magnitude': abs(score_change)
-                }
-            )
-            
+            alert = Alert(**rows[0])
             self.db.add(alert)
             self.db.commit()
             
-            logger.info(f"Created score change alert for company {company_id}: {score_change:+.1f} points")
+            logger.info(f"Created score change alert for company {company_id}: {alert.score_change:+.1f} points")
             return alert
             
         except Exception as e:
@@ -201,35 +174,11 @@ class AlertService:
     def create_news_alert(self, company_id: int, news_event) -> Optional[Alert]:
         """Create alert for high-risk news events"""
         try:
-            # Check if news event is high-risk
-            if not self._is_high_risk_news(news_event):
+            rows = self.evaluate_news_events([news_event], company_ids=[company_id])
+            if not rows:
                 return None
             
-            # Determine severity based on event type and sentiment
-            severity = self._determine_news_severity(news_event)
-            
-            # Create alert
-            alert = Alert(
-                company_id=company_id,
-                alert_type="news_event",
-                severity=severity,
-                title=f"High-Risk News Alert: {news_event.event_type.title()}",
-                message=f"High-risk news detected: {news_event.headline[:100]}...",
-                trigger_value=news_event.risk_score,
-                threshold_value=0.7,
-                context_data={
-                    'event_type': news_event.event_type,
-                    'sentiment_score': news_event.sentiment_score,
-                    'risk_score': news_event.risk_score,
-                    'keywords': news_event.keywords
-                },
-                related_events=[{
-                    'headline': news_event.headline,
-                    'url': news_event.url,
-                    'published_at': news_event.published_at.isoformat()
-                }]
-            )
-            
+            alert = Alert(**rows[0])
             self.db.add(alert)
             self.db.commit()
             
@@ -241,35 +190,121 @@ class AlertService:
             logger.error(f"Error creating news alert: {e}")
             return None
     
-    def _is_high_risk_news(self, news_event) -> bool:
-        """Check if news event is high-risk"""
-        high_risk_events = ['default', 'legal', 'restructuring']
-        high_risk_sentiment = news_event.sentiment_score < -0.5
-        high_risk_score = news_event.risk_score > 0.7
+    def evaluate_score_changes(self, company_ids: Sequence[int], previous_scores: Sequence[Optional[float]],
+                               current_scores: Sequence[float]) -> List[Dict[str, Any]]:
+        """Alert rows for every score move past the threshold, with severities applied as array operations"""
+        previous = np.asarray(previous_scores, dtype=float)
+        current = np.asarray(current_scores, dtype=float)
+        change = current - previous
+        magnitude = np.abs(change)
+        
+        # Companies without a previous score have a NaN change and never alert
+        triggered = np.flatnonzero(magnitude >= self.score_change_threshold)
+        if not len(triggered):
+            return []
         
-        return (news_event.event_type in high_risk_events or 
-                high_risk_sentiment or 
-                high_risk_score)
+        change_percentage = np.divide(
+            change * 100, previous, out=np.zeros_like(change), where=previous > 0
+        )
+        severity = np.select(
+            [magnitude >= 30, magnitude >= 20, magnitude >= 10],
+            ['critical', 'high', 'medium'],
+            default='low'
+        )
+        
+        return [
+            {
+                'company_id': int(company_ids[i]),
+                'alert_type': "score_change",
+                'severity': str(severity[i]),
+                'title': "Credit Score Change Alert",
+                'message': f"Credit score changed by {change[i]:+.1f} points ({change_percentage[i]:+.1f}%)",
+                'score_change': float(change[i]),
+                'previous_score': float(previous[i]),
+                'current_score': float(current[i]),
+                'change_percentage': float(change_percentage[i]),
+                'trigger_value': float(change[i]),
+                'threshold_value': self.score_change_threshold,
+                'context_data': {
+                    'change_direction': 'increase' if change[i] > 0 else 'decrease',
+                    'change_magnitude': float(magnitude[i])
+                }
+            }
+            for i in triggered
+        ]
     
-    def _determine_news_severity(self, news_event) -> str:
-        """Determine severity for news alert"""
-        if news_event.event_type == 'default':
-            return "critical"
-        elif news_event.event_type in ['legal', 'restructuring']:
-            return "high"
-        elif news_event.sentiment_score < -0.7:
-            return "high"
-        elif news_event.sentiment_score < -0.3:
-            return "medium"
-        else:
-            return "low"
+    def evaluate_news_events(self, events: Sequence[Any], company_ids: Optional[Sequence[int]] = None,
+                             published_after: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Alert rows for high-risk news events, optionally only those published after a cutoff"""
+        if not events:
+            return []
+        
+        company_ids = company_ids or [event.company_id for event in events]
+        event_type = np.array([event.event_type or '' for event in events], dtype=object)
+        sentiment = np.array([_or_nan(event.sentiment_score) for event in events], dtype=float)
+        risk = np.array([_or_nan(event.risk_score) for event in events], dtype=float)
+        
+        is_high_risk_event = np.isin(event_type, HIGH_RISK_NEWS_EVENTS)
+        triggered = is_high_risk_event | (sentiment < -0.5) | (risk > 0.7)
+        if published_after is not None:
+            triggered &= np.array([
+                event.published_at is not None and event.published_at >= published_after for event in events
+            ])
+        
+        triggered = np.flatnonzero(triggered)
+        if not len(triggered):
+            return []
+        
+        severity = np.select(
+            [event_type == 'default', is_high_risk_event, sentiment < -0.7, sentiment < -0.3],
+            ['critical', 'high', 'high', 'medium'],
+            default='low'
+        )
+        
+        rows = []
+        for i in triggered:
+            event = events[i]
+            rows.append({
+                'company_id': int(company_ids[i]),
+                'alert_type': "news_event",
+                'severity': str(severity[i]),
+                'title': f"High-Risk News Alert: {(event.event_type or 'news').title()}",
+                'message': f"High-risk news detected: {event.headline[:100]}...",
+                'trigger_value': event.risk_score,
+                'threshold_value': 0.7,
+                'context_data': {
+                    'event_type': event.event_type,
+                    'sentiment_score': event.sentiment_score,
+                    'risk_score': event.risk_score,
+                    'keywords': event.keywords
+                },
+                'related_events': [{
+                    'headline': event.headline,
+                    'url': event.url,
+                    'published_at': event.published_at.isoformat() if event.published_at else None
+                }]
+            })
+        
+        return rows
+    
+    def insert_alerts(self, rows: List[Dict[str, Any]]) -> int:
+        """Bulk insert alert rows in the caller's transaction; returns the number inserted"""
+        if not rows:
+            return 0
+        
+        # Core insert: context_data and related_events may be omitted per row
+        self.db.execute(insert(Alert.__table__), [
+            {'related_events': None, **row} for row in rows
+        ])
+        return len(rows)
     
-    def _format_alert(self, alert: Alert) -> Dict[str, Any]:
-        """Format alert for API response"""
+    def _format_alert(self, alert: Alert, company: Optional[CompanyRef] = None) -> Dict[str, Any]:
+        """Format alert for API response, using the given company instead of loading alert.company"""
+        company = company or alert.company
         return {
             'id': alert.id,
-            'ticker': alert.company.ticker,
-            'company_name': alert.company.name,
+            'ticker': company.ticker,
+            'company_name': company.name,
             'alert_type': alert.alert_type,
             'severity': alert.severity,
             'title': alert.title,
@@ -288,18 +323,35 @@ class AlertService:
             'expires_at': alert.expires_at.isoformat() if alert.expires_at else None
         }
     
-    def cleanup_expired_alerts(self) -> int:
-        """Clean up expired alerts"""
+    def cleanup_expired_alerts(self, chunk_size: Optional[int] = None) -> int:
+        """Delete expired alerts in primary-key ranges, one short transaction per chunk; returns the number deleted"""
+        chunk_size = chunk_size or settings.alert_cleanup_chunk_size
+        cutoff = datetime.now()
+        count = 0
+        last_id = 0
+        
         try:
-            expired_alerts = self.db.query(Alert).filter(
-                Alert.expires_at < datetime.now()
-            ).all()
-            
-            count = len(expired_alerts)
-            for alert in expired_alerts:
-                self.db.delete(alert)
-            
-            self.db.commit()
+            while True:
+                # Only the ids of one chunk are read; the alerts themselves are never loaded
+                ids = self.db.scalars(
+                    select(Alert.id).where(
+                        Alert.expires_at < cutoff,
+                        Alert.id > last_id
+                    ).order_by(Alert.id).limit(chunk_size)
+                ).all()
+                if not ids:
+                    break
+                
+                result = self.db.execute(
+                    delete(Alert).where(
+                        Alert.id.between(ids[0], ids[-1]),
+                        Alert.expires_at < cutoff
+                    ).execution_options(synchronize_session=False)
+                )
+                self.db.commit()
+                
+                count += result.rowcount
+                last_id = ids[-1]
             
             if count > 0:
                 logger.info(f"Cleaned up {count} expired alerts")
@@ -308,9 +360,10 @@ class AlertService:
             
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error cleaning up expired alerts: {e}")
-            return 0
-
-
+            logger.error(f"Error cleaning up expired alerts after {count} deleted: {e}")
+            return count
 
 
+def _or_nan(value: Optional[float]) -> float:
+    """Missing scores as NaN so threshold comparisons on them are false"""
+    return np.nan if value is None else float(value)
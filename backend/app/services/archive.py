@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+import logging
+from datetime import datetime
+from itertools import groupby
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Columns left out of the archive: full article bodies dwarf everything else and
+# the headline, summary and URL are kept
+EXCLUDED_COLUMNS = {
+    'news_events': {'content'}
+}
+
+
+def archive_columns(model: Any) -> List[Any]:
+    """Columns of a model's table that are written to the archive"""
+    excluded = EXCLUDED_COLUMNS.get(model.__tablename__, set())
+    return [column for column in model.__table__.columns if column.name not in excluded]
+
+
+class ArchiveStore:
+    """Date-partitioned Parquet copies of rows purged from the database"""
+    
+    def __init__(self, archive_dir: str, compression: str = "zstd"):
+        # Imported here so pyarrow is only needed where archiving is enabled
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("ARCHIVE_ENABLED requires pyarrow; install it or disable archiving") from e
+        
+        self.pa = pyarrow
+        self.ds = pyarrow.dataset
+        self.pq = pyarrow.parquet
+        self.archive_dir = archive_dir
+        self.compression = compression
+        self._partitioning = self.ds.partitioning(self.pa.schema([('day', self.pa.string())]), flavor='hive')
+    
+    def schema(self, model: Any):
+        """Arrow schema of a model's archived columns"""
+        return self.pa.schema([(column.name, self._arrow_type(column.type)) for column in archive_columns(model)])
+    
+    def _arrow_type(self, column_type: Any):
+        """Arrow type for a column; JSON is stored as text"""
+        if isinstance(column_type, Boolean):
+            return self.pa.bool_()
+        if isinstance(column_type, Integer):
+            return self.pa.int64()
+        if isinstance(column_type, Float):
+            return self.pa.float64()
+        if isinstance(column_type, DateTime):
+            return self.pa.timestamp('us')
+        return self.pa.string()
+    
+    def write(self, model: Any, timestamp_column: str, rows: Sequence[Dict[str, Any]]) -> int:
+        """Write rows into one file per calendar date of their timestamp; returns the number written"""
+        if not rows:
+            return 0
+        
+        table_name = model.__tablename__
+        columns = archive_columns(model)
+        schema = self.schema(model)
+        
+        records = [
+            {column.name: _archived_value(column, row[column.name]) for column in columns}
+            for row in rows
+        ]
+        records.sort(key=lambda record: _date_key(record[timestamp_column]))
+        
+        for day, day_records in groupby(records, key=lambda record: _date_key(record[timestamp_column])):
+            day_records = list(day_records)
+            directory = os.path.join(self.archive_dir, table_name, f"day={day}")
+            os.makedirs(directory, exist_ok=True)
+            
+            # Named by id range so re-archiving a batch after a failed delete overwrites it
+            ids = [record['id'] for record in day_records]
+            path = os.path.join(directory, f"part-{min(ids)}-{max(ids)}.parquet")
+            self.pq.write_table(
+                self.pa.Table.from_pylist(day_records, schema=schema), path, compression=self.compression
+            )
+        
+        return len(records)
+    
+    def read(self, model: Any, timestamp_column: str, columns: Iterable[str], company_id: int,
+             since: datetime, until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Archived rows of one company in a time range, reading only the requested columns"""
+        path = os.path.join(self.archive_dir, model.__tablename__)
+        if not os.path.isdir(path):
+            return []
+        
+        dataset = self.ds.dataset(path, format='parquet', partitioning=self._partitioning)
+        timestamp = self.ds.field(timestamp_column)
+        
+        # Date directories are pruned before any file is opened; the rest is pushed into the scan
+        condition = (
+            (self.ds.field('day') >= since.date().isoformat()) &
+            (self.ds.field('company_id') == company_id) &
+            (timestamp >= self.pa.scalar(since, self.pa.timestamp('us')))
+        )
+        if until is not None:
+            condition &= (
+                (self.ds.field('day') <= until.date().isoformat()) &
+                (timestamp < self.pa.scalar(until, self.pa.timestamp('us')))
+            )
+        
+        return dataset.to_table(columns=list(columns), filter=condition).to_pylist()
+
+
+def _archived_value(column: Any, value: Any) -> Any:
+    """Convert a database value to its archived representation"""
+    if value is None:
+        return None
+    if isinstance(column.type, JSON):
+        return json.dumps(value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Stored naive in local time, like the rest of the application's timestamps
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def _date_key(value: Optional[datetime]) -> str:
+    """Hive partition value for a row timestamp"""
+    return value.date().isoformat() if value is not None else 'unknown'
+
+
+_archive_store: Optional[ArchiveStore] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive_store() -> Optional[ArchiveStore]:
+    """Shared archive store, or None when archiving is disabled"""
+    global _archive_store
+    if not settings.archive_enabled:
+        return None
+    
+    with _archive_lock:
+        if _archive_store is None:
+            _archive_store = ArchiveStore(settings.archive_dir, settings.archive_compression)
+        return _archive_store
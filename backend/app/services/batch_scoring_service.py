@@ -0,0 +1,392 @@
+import math
+import pandas as pd
+import numpy as np
+from sqlalchemy import and_, delete, func, insert, select, union
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional
+import logging
+import time
+from datetime import datetime, timedelta
+
+from app.core.database import SessionLocal
+from app.models.company import Company
+from app.models.financial_data import FinancialData
+from app.models.news_event import NewsEvent
+from app.models.credit_score import CreditScore
+from app.models.latest_credit_score import LatestCreditScore
+from app.models.score_dirty_company import ScoreDirtyCompany
+from app.services.scoring_service import ScoringService
+from app.services.alert_service import AlertService
+from app.services.dirty_tracking import mark_companies_dirty
+from app.services.news_window import NEWS_WINDOW_DAYS, NewsWindowStats, news_window
+from app.services.response_cache import response_cache
+from app.services.model_scoring import FINANCIAL_COLUMNS, add_news_features, get_distress_model, get_scorer
+from app.services.partitions import partitions
+
+logger = logging.getLogger(__name__)
+
+SCORE_VALIDITY_HOURS = 24
+
+
+class BatchScoringService:
+    """Service for scoring every active company in a handful of queries"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.scoring_service = ScoringService(db)
+        self.alert_service = AlertService(db)
+        self.financial_weight = self.scoring_service.financial_weight
+        self.market_weight = self.scoring_service.market_weight
+        self.news_weight = self.scoring_service.news_weight
+    
+    async def compute_all_credit_scores(self, background_tasks) -> Dict[str, Any]:
+        """Schedule a batch scoring run for all active companies"""
+        try:
+            companies_count = self.db.query(Company).filter(Company.is_active == True).count()
+            
+            if not companies_count:
+                return {"companies_count": 0, "message": "No active companies found"}
+            
+            background_tasks.add_task(self.compute_all_scores)
+            
+            return {
+                "companies_count": companies_count,
+                "message": f"Batch credit score computation initiated for {companies_count} companies"
+            }
+            
+        except Exception as e:
+            logger.error(f"Error scheduling batch credit score computation: {e}")
+            raise
+    
+    def compute_all_scores(self, dirty_only: bool = False) -> Dict[str, Any]:
+        """Compute and store credit scores in one transaction, for every active company or only the dirty set"""
+        start = time.perf_counter()
+        started_at = datetime.now()
+        
+        try:
+            if dirty_only:
+                # Changes are marked at ingestion; window expiry and staleness are found here
+                mark_companies_dirty(self.db, self._find_due_companies(started_at), marked_at=started_at)
+            
+            frame = self._load_latest_financial_data(dirty_only)
+            
+            if frame.empty:
+                self._clear_dirty(started_at)
+                self.db.commit()
+                logger.info("No companies due for batch scoring")
+                return {'companies_scored': 0, 'alerts_created': 0, 'duration_seconds': time.perf_counter() - start}
+            
+            news = news_window.get_many(self.db, frame['company_id'])
+            history = self._load_score_history(dirty_only)
+            
+            # Component scores as column operations
+            frame['financial_score'] = self._financial_scores(frame)
+            frame['market_score'] = self._market_scores(frame)
+            frame['news_score'] = self._news_scores(frame, news)
+            
+            # Overall score for every company in one call to the scorer
+            scorer = get_scorer(self.financial_weight, self.market_weight, self.news_weight)
+            frame['overall_score'] = scorer.score(frame)
+            
+            # The distress model is recorded next to the score, not blended into it
+            distress_model = get_distress_model()
+            if distress_model:
+                frame['distress_probability'] = distress_model.predict(add_news_features(frame, news))
+            
+            # Trend and volatility from the in-memory score history
+            frame = frame.join(self._history_features(history), on='company_id')
+            previous = frame['previous_score']
+            frame['score_change'] = np.where(
+                previous.notna() & (previous != 0), frame['overall_score'] - previous, 0.0
+            )
+            frame['trend_direction'] = np.select(
+                [frame['score_change'] > 5, frame['score_change'] < -5],
+                ['increasing', 'decreasing'],
+                default='stable'
+            )
+            frame['volatility'] = frame['volatility'].fillna(0.0)
+            
+            rows = self._build_score_rows(frame, news, scorer, distress_model)
+            partitions.ensure(self.db, 'credit_scores', [rows[0]['calculated_at']])
+            
+            inserted = self.db.execute(
+                insert(CreditScore).returning(CreditScore.id, CreditScore.company_id), rows
+            ).all()
+            
+            # Latest-score projection is updated in the same transaction
+            credit_score_ids = {company_id: score_id for score_id, company_id in inserted}
+            self.scoring_service._upsert_latest_scores([
+                {
+                    'company_id': row['company_id'],
+                    'credit_score_id': credit_score_ids[row['company_id']],
+                    'overall_score': row['overall_score'],
+                    'score_change': row['score_change'],
+                    'trend_direction': row['trend_direction'],
+                    'calculated_at': row['calculated_at']
+                }
+                for row in rows
+            ])
+            
+            # Alerts on moves since each company's last stored score, committed with the scores
+            alerts_created = self.alert_service.insert_alerts(self.alert_service.evaluate_score_changes(
+                frame['company_id'].to_numpy(), frame['last_score'].to_numpy(dtype=float),
+                frame['overall_score'].to_numpy(dtype=float)
+            ))
+            
+            self._clear_dirty(started_at)
+            self.db.commit()
+            response_cache.invalidate(credit_score_ids)
+            
+            duration = time.perf_counter() - start
+            logger.info(f"Batch scored {len(rows)} companies in {duration:.2f}s ({alerts_created} alerts)")
+            
+            return {'companies_scored': len(rows), 'alerts_created': alerts_created, 'duration_seconds': duration}
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error in batch score computation: {e}")
+            raise
+    
+    def _find_due_companies(self, now: datetime) -> List[int]:
+        """Companies due for rescoring without new inputs: expired news, stale or missing scores"""
+        window_start = now - timedelta(days=NEWS_WINDOW_DAYS)
+        
+        # Articles inside the window at the last scoring that have since dropped out of it;
+        # scores older than the validity period are rescored anyway, which bounds the range
+        oldest_valid = now - timedelta(hours=SCORE_VALIDITY_HOURS)
+        last_expired = self.db.query(
+            LatestCreditScore.company_id,
+            LatestCreditScore.calculated_at,
+            func.max(NewsEvent.published_at)
+        ).join(
+            NewsEvent, NewsEvent.company_id == LatestCreditScore.company_id
+        ).filter(
+            LatestCreditScore.calculated_at >= oldest_valid,
+            NewsEvent.published_at >= oldest_valid - timedelta(days=NEWS_WINDOW_DAYS),
+            NewsEvent.published_at < window_start
+        ).group_by(LatestCreditScore.company_id, LatestCreditScore.calculated_at).all()
+        expired_news = {
+            company_id for company_id, calculated_at, published_at in last_expired
+            if published_at >= calculated_at - timedelta(days=NEWS_WINDOW_DAYS)
+        }
+        
+        # Scores past their validity period
+        stale = select(LatestCreditScore.company_id).where(
+            LatestCreditScore.calculated_at < oldest_valid
+        )
+        
+        # Companies with financial data that were never scored
+        unscored = select(Company.id).where(
+            Company.is_active == True,
+            ~select(LatestCreditScore.company_id).where(LatestCreditScore.company_id == Company.id).exists(),
+            select(FinancialData.id).where(FinancialData.company_id == Company.id).exists()
+        )
+        
+        return list(expired_news.union(self.db.scalars(union(stale, unscored))))
+    
+    def _clear_dirty(self, started_at: datetime):
+        """Clear marks consumed by this run; marks made after it started stay for the next run"""
+        self.db.execute(delete(ScoreDirtyCompany).where(ScoreDirtyCompany.marked_at <= started_at))
+    
+    def _scope(self, statement, dirty_only: bool):
+        """Restrict a statement joined to companies to the dirty set"""
+        if dirty_only:
+            return statement.join(ScoreDirtyCompany, ScoreDirtyCompany.company_id == Company.id)
+        return statement
+    
+    def _load_latest_financial_data(self, dirty_only: bool = False) -> pd.DataFrame:
+        """Load the latest financial data row for every active company"""
+        latest = select(
+            FinancialData.company_id,
+            func.max(FinancialData.date).label('max_date')
+        ).group_by(FinancialData.company_id).subquery()
+        
+        statement = select(
+            FinancialData.id,
+            FinancialData.company_id,
+            Company.ticker,
+            *[getattr(FinancialData, column) for column in FINANCIAL_COLUMNS]
+        ).join(
+            latest,
+            and_(
+                FinancialData.company_id == latest.c.company_id,
+                FinancialData.date == latest.c.max_date
+            )
+        ).join(Company, Company.id == FinancialData.company_id).where(
+            Company.is_active == True
+        )
+        
+        result = self.db.execute(self._scope(statement, dirty_only))
+        frame = pd.DataFrame(result.all(), columns=list(result.keys()))
+        
+        # Several rows may share the latest timestamp; keep the newest insert
+        frame = frame.sort_values('id').drop_duplicates('company_id', keep='last')
+        frame[FINANCIAL_COLUMNS] = frame[FINANCIAL_COLUMNS].astype(float)
+        return frame.reset_index(drop=True)
+    
+    def _load_score_history(self, dirty_only: bool = False) -> pd.DataFrame:
+        """Load the last 10 credit scores for every active company"""
+        ranked = self._scope(select(
+            CreditScore.company_id,
+            CreditScore.overall_score,
+            func.row_number().over(
+                partition_by=CreditScore.company_id,
+                order_by=CreditScore.calculated_at.desc()
+            ).label('rank')
+        ).join(Company, Company.id == CreditScore.company_id).where(
+            Company.is_active == True
+        ), dirty_only).subquery()
+        
+        result = self.db.execute(select(ranked).where(ranked.c.rank <= 10))
+        return pd.DataFrame(result.all(), columns=list(result.keys()))
+    
+    def _financial_scores(self, frame: pd.DataFrame) -> np.ndarray:
+        """Vectorized equivalent of ScoringService._calculate_financial_score"""
+        score = 50.0 + (
+            _banded(frame['debt_to_equity'], [(np.less_equal, 0.5, 20), (np.less_equal, 1.0, 10),
+                                              (np.less_equal, 2.0, -10)], -20) +
+            _banded(frame['current_ratio'], [(np.greater_equal, 2.0, 15), (np.greater_equal, 1.5, 10),
+                                             (np.greater_equal, 1.0, 5)], -15) +
+            _banded(frame['return_on_equity'], [(np.greater_equal, 0.15, 15), (np.greater_equal, 0.10, 10),
+                                                (np.greater_equal, 0.05, 5)], -10) +
+            _banded(frame['revenue_growth'], [(np.greater_equal, 0.10, 10), (np.greater_equal, 0.05, 5),
+                                              (np.less, 0, -10)], 0)
+        )
+        return np.clip(score, 0, 100)
+    
+    def _market_scores(self, frame: pd.DataFrame) -> np.ndarray:
+        """Vectorized equivalent of ScoringService._calculate_market_score"""
+        score = 50.0 + (
+            _banded(frame['price_volatility'], [(np.less_equal, 0.2, 20), (np.less_equal, 0.3, 10),
+                                                (np.less_equal, 0.4, 5)], -10) +
+            _banded(frame['beta'], [(np.less_equal, 0.8, 15), (np.less_equal, 1.2, 10),
+                                    (np.less_equal, 1.5, 5)], -10) +
+            _banded(frame['market_cap'], [(np.greater_equal, 10000, 15), (np.greater_equal, 1000, 10),
+                                          (np.greater_equal, 100, 5)], -5)
+        )
+        return np.clip(score, 0, 100)
+    
+    def _news_scores(self, frame: pd.DataFrame, news: Dict[int, NewsWindowStats]) -> np.ndarray:
+        """Vectorized equivalent of ScoringService._calculate_news_score over the rolling aggregates"""
+        windows = [news[company_id] for company_id in frame['company_id']]
+        article_count = np.array([window.article_count for window in windows], dtype=float)
+        sentiment_sum = np.array([window.sentiment_sum for window in windows], dtype=float)
+        risk_penalty = np.array([window.risk_penalty for window in windows], dtype=float)
+        
+        avg_sentiment = np.divide(sentiment_sum, article_count, out=np.zeros_like(sentiment_sum), where=article_count > 0)
+        score = 50.0 + avg_sentiment * 30 - np.minimum(risk_penalty, 20)
+        
+        # Companies without news in the window stay neutral
+        score = np.where(article_count > 0, score, 50.0)
+        return np.clip(score, 0, 100)
+    
+    def _history_features(self, history: pd.DataFrame) -> pd.DataFrame:
+        """Derive last and previous score and score volatility per company"""
+        if history.empty:
+            return pd.DataFrame(columns=['last_score', 'previous_score', 'volatility'], dtype=float)
+        
+        # Most recent stored score, which alerts compare the new score against
+        last = history[history['rank'] == 1].set_index('company_id')['overall_score']
+        
+        # Same row _get_previous_score picks: the second most recent score
+        previous = history[history['rank'] == 2].set_index('company_id')['overall_score']
+        
+        grouped = history.groupby('company_id')['overall_score']
+        volatility = grouped.std(ddof=0).where(grouped.count() >= 2, 0.0)
+        
+        return pd.DataFrame({'last_score': last, 'previous_score': previous, 'volatility': volatility})
+    
+    def _build_score_rows(self, frame: pd.DataFrame, news: Dict[int, NewsWindowStats],
+                          scorer: Any, distress_model: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Assemble credit score rows with explanations for bulk insertion"""
+        records = frame.astype(object).where(frame.notna(), None)
+        calculated_at = datetime.now()
+        valid_until = calculated_at + timedelta(hours=SCORE_VALIDITY_HOURS)
+        
+        rows = []
+        for record in records.itertuples(index=False):
+            company_news = news[record.company_id]
+            
+            explanation_data = self.scoring_service._generate_explanation(
+                record.ticker, record.overall_score, record.financial_score, record.market_score,
+                record.news_score, record, company_news, record.score_change
+            )
+            feature_importance = self.scoring_service._calculate_feature_importance(record, company_news)
+            
+            rows.append({
+                'company_id': int(record.company_id),
+                'overall_score': float(record.overall_score),
+                'financial_score': float(record.financial_score),
+                'market_score': float(record.market_score),
+                'news_score': float(record.news_score),
+                'score_change': float(record.score_change),
+                'trend_direction': record.trend_direction,
+                'volatility': float(record.volatility),
+                'explanation_summary': explanation_data['explanation_summary'],
+                'key_factors': explanation_data['key_factors'],
+                'risk_indicators': explanation_data['risk_indicators'],
+                'feature_importance': {k: float(v) for k, v in feature_importance.items()},
+                'score_breakdown': distress_model.breakdown(record.distress_probability) if distress_model else None,
+                'model_version': scorer.model_version,
+                'calculation_method': scorer.method,
+                'confidence_level': 0.85,
+                'calculated_at': calculated_at,
+                'valid_until': valid_until
+            })
+        
+        return rows
+
+
+def _banded(values: pd.Series, bands: List[tuple], default: float) -> np.ndarray:
+    """Map values onto score adjustments by threshold band; missing values add nothing"""
+    values = values.to_numpy(dtype=float)
+    conditions = [compare(values, threshold) for compare, threshold, _ in bands]
+    choices = [points for _, _, points in bands]
+    return np.where(np.isnan(values), 0, np.select(conditions, choices, default=default))
+
+
+def changed_financial_inputs(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """Companies whose new financial rows differ from their stored latest row in a scored column"""
+    company_ids = {row['company_id'] for row in rows}
+    
+    latest = select(
+        FinancialData.company_id,
+        func.max(FinancialData.date).label('max_date')
+    ).where(FinancialData.company_id.in_(company_ids)).group_by(FinancialData.company_id).subquery()
+    
+    stored = {
+        row.company_id: row
+        for row in db.execute(
+            select(FinancialData.company_id, *[getattr(FinancialData, column) for column in FINANCIAL_COLUMNS]).join(
+                latest,
+                and_(
+                    FinancialData.company_id == latest.c.company_id,
+                    FinancialData.date == latest.c.max_date
+                )
+            )
+        )
+    }
+    
+    return [
+        row['company_id'] for row in rows
+        if row['company_id'] not in stored or any(
+            not _same_value(row.get(column), getattr(stored[row['company_id']], column))
+            for column in FINANCIAL_COLUMNS
+        )
+    ]
+
+
+def _same_value(new: Any, old: Any) -> bool:
+    """Compare stored floats, treating missing values as equal only to each other"""
+    if new is None or old is None:
+        return new is None and old is None
+    return math.isclose(float(new), float(old), rel_tol=1e-9, abs_tol=1e-12)
+
+
+def run_dirty_scoring() -> Dict[str, Any]:
+    """Rescore the companies whose inputs changed or whose news window moved, in a dedicated session"""
+    db = SessionLocal()
+    try:
+        return BatchScoringService(db).compute_all_scores(dirty_only=True)
+    finally:
+        db.close()
@@ -0,0 +1,77 @@
+import threading
+import time
+from sqlalchemy.orm import Session
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+import logging
+
+from app.models.company import Company
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CompanyRef(NamedTuple):
+    """Session-independent snapshot of the company fields used by read paths"""
+    id: int
+    ticker: str
+    name: str
+    sector: Optional[str]
+
+
+class CompanyCache:
+    """Process-wide TTL cache mapping tickers to active companies"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Optional[CompanyRef]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, db: Session, ticker: str) -> Optional[CompanyRef]:
+        """Get the active company for a ticker, or None if there is none"""
+        key = ticker.upper()
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        row = db.query(Company.id, Company.ticker, Company.name, Company.sector).filter(
+            Company.ticker == key,
+            Company.is_active == True
+        ).first()
+        company = CompanyRef(*row) if row else None
+        
+        # Unknown tickers are cached too; create_company invalidates them
+        with self._lock:
+            self._entries[key] = (now + self.ttl, company)
+        
+        return company
+    
+    def invalidate(self, ticker: Optional[str] = None):
+        """Drop one ticker, or every entry when no ticker is given"""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ticker.upper(), None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and hit ratio"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups > 0 else 0.0,
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl
+            }
+
+
+# Process-wide cache shared by all services
+company_cache = CompanyCache(ttl=settings.company_cache_ttl)
@@ -8,6 +8,9 @@ from app.models.financial_data import FinancialData
 from app.models.credit_score import CreditScore
 from app.models.news_event import NewsEvent
 from app.models.alert import Alert
+from app.services.company_cache import company_cache
+from app.services.response_cache import response_cache
+from app.services.financial_service import evict_market_data
 from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyResponse, CompanySummary
 
 logger = logging.getLogger(__name__)
@@ -75,6 +78,7 @@ class CompanyService:
             self.db.add(company)
             self.db.commit()
             self.db.refresh(company)
+            company_cache.invalidate(company.ticker)
             
             logger.info(f"Created new company: {company.ticker}")
             return CompanyResponse.from_orm(company)
@@ -104,6 +108,11 @@ class CompanyService:
             
             self.db.commit()
             self.db.refresh(company)
+            company_cache.invalidate(ticker)
+            company_cache.invalidate(company.ticker)
+            response_cache.invalidate([company.id])
+            if company.ticker != ticker.upper():
+                evict_market_data(ticker)
             
             logger.info(f"Updated company: {company.ticker}")
             return CompanyResponse.from_orm(company)
@@ -129,6 +138,8 @@ class CompanyService:
             company.updated_at = datetime.now()
             
             self.db.commit()
+            company_cache.invalidate(company.ticker)
+            evict_market_data(company.ticker)
             
             logger.info(f"Deleted company: {company.ticker}")
             return True
@@ -6,7 +6,9 @@ from datetime import datetime, timedelta
 from app.models.company import Company
 from app.services.financial_service import FinancialService
 from app.services.news_service import NewsService
+from app.services.refresh_engine import RefreshEngine
 from app.core.config import settings
+from app.services.company_cache import company_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +25,7 @@ class DataService:
         """Fetch all data for a company (financial + news)"""
         try:
             # Check if company exists
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 raise ValueError(f"Company with ticker {ticker} not found or inactive")
@@ -48,10 +47,7 @@ class DataService:
     def get_data_status(self, ticker: str) -> Dict[str, Any]:
         """Get data freshness status for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
@@ -99,10 +95,10 @@ class DataService:
             if not companies:
                 return {"companies_count": 0, "message": "No active companies found"}
             
-            # Add background tasks for each company
-            for company in companies:
-                background_tasks.add_task(self.financial_service.fetch_financial_data, company.ticker)
-                background_tasks.add_task(self.news_service.fetch_news_data, company.ticker)
+            # Refresh all companies through the bounded-concurrency engine
+            background_tasks.add_task(
+                RefreshEngine().refresh, [company.ticker for company in companies]
+            )
             
             return {
                 "companies_count": len(companies),
@@ -117,10 +113,7 @@ class DataService:
     def get_data_quality_metrics(self, ticker: str) -> Dict[str, Any]:
         """Get data quality metrics for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
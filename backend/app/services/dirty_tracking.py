@@ -0,0 +1,28 @@
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional
+import logging
+from datetime import datetime
+
+from app.models.score_dirty_company import ScoreDirtyCompany
+from app.core.database import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+
+def mark_companies_dirty(db: Session, company_ids: Iterable[int], marked_at: Optional[datetime] = None):
+    """Flag companies for rescoring in the caller's transaction"""
+    marked_at = marked_at or datetime.now()
+    rows = [{'company_id': company_id, 'marked_at': marked_at} for company_id in set(company_ids)]
+    if not rows:
+        return
+    
+    statement = dialect_insert(ScoreDirtyCompany)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=['company_id'],
+            set_={'marked_at': statement.excluded.marked_at},
+            # Never move a mark back, or a scoring run could clear a newer change
+            where=ScoreDirtyCompany.marked_at < statement.excluded.marked_at
+        ),
+        rows
+    )
@@ -1,20 +1,75 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import time
 from fredapi import Fred
 
 from app.models.company import Company
 from app.models.financial_data import FinancialData
 from app.core.config import settings
+from app.core.executors import run_blocking
+from app.core.http_client import retry_async
+from app.services.company_cache import company_cache
+from app.services.batch_scoring_service import changed_financial_inputs
+from app.services.dirty_tracking import mark_companies_dirty
+from app.services.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
 
+class TickerCache:
+    """Process-wide LRU of per-ticker market data, bounded to a number of tickers"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, ticker: str) -> Any:
+        """Get a ticker's entry, or None"""
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is not None:
+                self._entries.move_to_end(ticker)
+            return entry
+    
+    def put(self, ticker: str, entry: Any):
+        """Store a ticker's entry, evicting the least recently used tickers"""
+        with self._lock:
+            self._entries[ticker] = entry
+            self._entries.move_to_end(ticker)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+    
+    def pop(self, ticker: str):
+        """Drop a ticker's entry"""
+        with self._lock:
+            self._entries.pop(ticker, None)
+
+
+# Caches shared by all FinancialService instances: daily close/volume bars per
+# ticker and (fetched_at, info) fundamentals per ticker
+_price_history = TickerCache(settings.market_data_cache_size)
+_fundamentals = TickerCache(settings.market_data_cache_size)
+
+# Slow-moving stock info fields kept for the fundamentals TTL; price, volume
+# and market cap come from the latest bars on every fetch instead
+FUNDAMENTAL_FIELDS = (
+    'sector', 'sharesOutstanding', 'marketCap', 'debtToEquity', 'currentRatio', 'quickRatio',
+    'returnOnEquity', 'returnOnAssets', 'trailingEps', 'totalRevenue', 'netIncomeToCommon',
+    'trailingPE', 'priceToBook', 'dividendYield', 'beta'
+)
+
+
 class FinancialService:
     """Service for fetching and processing financial data"""
     
@@ -25,28 +80,16 @@ class FinancialService:
         """Fetch financial data from Yahoo Finance"""
         try:
             # Check if company exists
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = await run_blocking(company_cache.get, self.db, ticker)
             
             if not company:
                 raise ValueError(f"Company with ticker {ticker} not found or inactive")
             
-            # Fetch data from Yahoo Finance
-            ticker_obj = yf.Ticker(ticker)
-            
-            # Get stock info
-            info = ticker_obj.info
-            
-            # Get historical data
-            hist = ticker_obj.history(period="1y")
-            
-            # Calculate financial metrics
-            financial_data = self._process_financial_data(ticker, info, hist)
+            # Single tickers share the bulk path and its price/fundamentals caches
+            result = (await self.fetch_financial_data_bulk([company.ticker]))[company.ticker]
             
-            # Save to database
-            self._save_financial_data(company.id, financial_data)
+            if result["status"] != "success":
+                raise RuntimeError(result["error"])
             
             logger.info(f"Successfully fetched financial data for {ticker}")
             return {"status": "success", "ticker": ticker}
@@ -55,13 +98,177 @@ class FinancialService:
             logger.error(f"Error fetching financial data for {ticker}: {e}")
             raise
     
+    async def fetch_financial_data_bulk(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch financial data for many tickers with batched, incremental price downloads"""
+        tickers = [ticker.upper() for ticker in tickers]
+        
+        # Database work is blocking and runs on the worker pool, like the downloads
+        companies, latest_dates = await run_blocking(self._load_companies, tickers)
+        
+        results = {
+            ticker: {"status": "error", "ticker": ticker, "error": "Company not found or inactive"}
+            for ticker in tickers if ticker not in companies
+        }
+        
+        if not companies:
+            return results
+        
+        bars = await self._update_price_history({
+            ticker: latest_dates.get(company_id) for ticker, company_id in companies.items()
+        })
+        fundamentals = await self._get_fundamentals(list(companies))
+        
+        stored = await run_blocking(self._store_financial_data, companies, fundamentals, bars)
+        results.update(stored)
+        
+        succeeded = sum(1 for result in stored.values() if result['status'] == 'success')
+        logger.info(f"Bulk fetched financial data for {succeeded}/{len(tickers)} tickers")
+        return results
+    
+    def _load_companies(self, tickers: List[str]) -> Tuple[Dict[str, int], Dict[int, datetime]]:
+        """Active company ids by ticker and the latest stored observation date per company"""
+        companies = dict(self.db.query(Company.ticker, Company.id).filter(
+            Company.ticker.in_(tickers),
+            Company.is_active == True
+        ).all())
+        
+        if not companies:
+            return companies, {}
+        
+        # Latest stored observation per company bounds what needs downloading
+        latest_dates = dict(self.db.query(
+            FinancialData.company_id, func.max(FinancialData.date)
+        ).filter(
+            FinancialData.company_id.in_(companies.values())
+        ).group_by(FinancialData.company_id).all())
+        
+        return companies, latest_dates
+    
+    def _store_financial_data(self, companies: Dict[str, int], fundamentals: Dict[str, Dict],
+                              bars: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, Dict[str, Any]]:
+        """Process the cached bars and fundamentals of each company and save them in one batch"""
+        results = {}
+        rows = []
+        for ticker, company_id in companies.items():
+            try:
+                if ticker not in fundamentals:
+                    raise RuntimeError("Fundamentals unavailable")
+                
+                hist = bars.get(ticker)
+                if hist is None:
+                    hist = pd.DataFrame(columns=['Close', 'Volume'])
+                rows.append(self._financial_data_mapping(
+                    company_id, self._process_financial_data(ticker, fundamentals[ticker], hist)
+                ))
+                results[ticker] = {"status": "success", "ticker": ticker}
+                
+            except Exception as e:
+                logger.error(f"Error processing financial data for {ticker}: {e}")
+                results[ticker] = {"status": "error", "ticker": ticker, "error": str(e)}
+        
+        if rows:
+            self._save_financial_data_bulk(rows)
+        
+        return results
+    
+    async def _update_price_history(self, latest_dates: Dict[str, Optional[datetime]]) -> Dict[str, Optional[pd.DataFrame]]:
+        """Download price bars newer than the stored/cached data, merge them into the cache and return each ticker's bars"""
+        # One chart request per ticker, run concurrently on the worker pool
+        updates = await asyncio.gather(*[
+            retry_async(
+                lambda ticker=ticker, latest_date=latest_date: run_blocking(
+                    self._update_ticker_prices, ticker, latest_date
+                ),
+                f"Yahoo Finance price history for {ticker}"
+            )
+            for ticker, latest_date in latest_dates.items()
+        ], return_exceptions=True)
+        
+        bars = {}
+        for ticker, update in zip(latest_dates, updates):
+            if isinstance(update, Exception):
+                logger.error(f"Error downloading prices for {ticker}: {update}")
+                # Score from the bars already held
+                update = _price_history.get(ticker)
+            bars[ticker] = update
+        
+        return bars
+    
+    def _update_ticker_prices(self, ticker: str, latest_date: Optional[datetime]) -> Optional[pd.DataFrame]:
+        """Download a ticker's missing bars and merge them into the cache (blocking, runs on a worker thread)"""
+        cached = _price_history.get(ticker)
+        if cached is None:
+            # Bars saved before a restart, so only the days since are downloaded
+            cached = _load_saved_prices(ticker)
+        
+        if cached is None or cached.empty or latest_date is None:
+            start = None  # Cold cache: full one-year lookback
+        else:
+            start = min(latest_date.date(), cached.index[-1].date())
+        
+        frame = self._download_prices(ticker, start)
+        if frame.empty:
+            return cached
+        return _merge_price_history(ticker, cached, frame)
+    
+    def _download_prices(self, ticker: str, start: Optional[date]) -> pd.DataFrame:
+        """Download daily close/volume bars for a ticker (blocking, runs on a worker thread)"""
+        period_args = {'period': '1y'} if start is None else {'start': start.isoformat()}
+        
+        # Ticker.history returns its own frame; only yf.download shares module-level
+        # state, so concurrent calls need no lock
+        data = yf.Ticker(ticker).history(auto_adjust=False, raise_errors=True, **period_args)
+        if data.empty:
+            return pd.DataFrame(columns=['Close', 'Volume'])
+        
+        if data.index.tz is not None:
+            data.index = data.index.tz_localize(None)
+        return data[['Close', 'Volume']].dropna(subset=['Close'])
+    
+    async def _get_fundamentals(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Get slow-moving stock info per ticker, refreshing entries older than the fundamentals TTL"""
+        now = datetime.now()
+        ttl = timedelta(seconds=settings.fundamentals_ttl)
+        cached = {ticker: _fundamentals.get(ticker) for ticker in tickers}
+        stale = [
+            ticker for ticker, entry in cached.items()
+            if entry is None or now - entry[0] > ttl
+        ]
+        
+        infos = await asyncio.gather(*[
+            retry_async(
+                lambda ticker=ticker: run_blocking(self._download_info, ticker),
+                f"Yahoo Finance info for {ticker}"
+            )
+            for ticker in stale
+        ], return_exceptions=True)
+        
+        for ticker, info in zip(stale, infos):
+            if isinstance(info, Exception):
+                logger.error(f"Error fetching fundamentals for {ticker}: {info}")
+                continue
+            cached[ticker] = (now, info)
+            _fundamentals.put(ticker, cached[ticker])
+        
+        return {ticker: entry[1] for ticker, entry in cached.items() if entry is not None}
+    
+    def _download_info(self, ticker: str) -> Dict:
+        """Download the fundamental fields of the stock info (blocking, runs on a worker thread)"""
+        info = yf.Ticker(ticker).info
+        return {field: info[field] for field in FUNDAMENTAL_FIELDS if field in info}
+    
     def _process_financial_data(self, ticker: str, info: Dict, hist: pd.DataFrame) -> Dict[str, Any]:
         """Process raw financial data into structured format"""
         try:
-            # Extract basic info
-            stock_price = info.get('currentPrice', hist['Close'].iloc[-1] if not hist.empty else None)
-            market_cap = info.get('marketCap', 0) / 1e6  # Convert to millions
-            volume = info.get('volume', hist['Volume'].iloc[-1] if not hist.empty else None)
+            # Price and volume from the latest bar; market cap follows the price
+            stock_price = float(hist['Close'].iloc[-1]) if not hist.empty else None
+            volume = float(hist['Volume'].iloc[-1]) if not hist.empty else None
+            shares = info.get('sharesOutstanding')
+            if stock_price and shares:
+                market_cap = stock_price * shares / 1e6  # Convert to millions
+            else:
+                # Quoted market cap as of the last fundamentals refresh
+                market_cap = (info.get('marketCap') or 0) / 1e6
             
             # Financial ratios
             debt_to_equity = info.get('debtToEquity', None)
@@ -119,47 +326,67 @@ class FinancialService:
             logger.error(f"Error processing financial data for {ticker}: {e}")
             raise
     
+    def _financial_data_mapping(self, company_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map processed financial data onto FinancialData columns"""
+        return {
+            'company_id': company_id,
+            'date': datetime.now(),
+            'stock_price': data.get('stock_price'),
+            'volume': data.get('volume'),
+            'market_cap': data.get('market_cap'),
+            'debt_to_equity': data.get('debt_to_equity'),
+            'current_ratio': data.get('current_ratio'),
+            'quick_ratio': data.get('quick_ratio'),
+            'return_on_equity': data.get('return_on_equity'),
+            'return_on_assets': data.get('return_on_assets'),
+            'eps': data.get('eps'),
+            'revenue': data.get('revenue'),
+            'revenue_growth': data.get('revenue_growth'),
+            'net_income': data.get('net_income'),
+            'pe_ratio': data.get('pe_ratio'),
+            'pb_ratio': data.get('pb_ratio'),
+            'dividend_yield': data.get('dividend_yield'),
+            'price_volatility': data.get('price_volatility'),
+            'beta': data.get('beta'),
+            'data_source': 'yahoo_finance'
+        }
+    
     def _save_financial_data(self, company_id: int, data: Dict[str, Any]):
         """Save financial data to database"""
         try:
-            financial_data = FinancialData(
-                company_id=company_id,
-                date=datetime.now(),
-                stock_price=data.get('stock_price'),
-                volume=data.get('volume'),
-                market_cap=data.get('market_cap'),
-                debt_to_equity=data.get('debt_to_equity'),
-                current_ratio=data.get('current_ratio'),
-                quick_ratio=data.get('quick_ratio'),
-                return_on_equity=data.get('return_on_equity'),
-                return_on_assets=data.get('return_on_assets'),
-                eps=data.get('eps'),
-                revenue=data.get('revenue'),
-                revenue_growth=data.get('revenue_growth'),
-                net_income=data.get('net_income'),
-                pe_ratio=data.get('pe_ratio'),
-                pb_ratio=data.get('pb_ratio'),
-                dividend_yield=data.get('dividend_yield'),
-                price_volatility=data.get('price_volatility'),
-                beta=data.get('beta'),
-                data_source='yahoo_finance'
-            )
+            mapping = self._financial_data_mapping(company_id, data)
+            changed = changed_financial_inputs(self.db, [mapping])
             
-            self.db.add(financial_data)
+            self.db.add(FinancialData(**mapping))
+            mark_companies_dirty(self.db, changed)
             self.db.commit()
+            response_cache.invalidate([company_id])
             
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error saving financial data: {e}")
             raise
     
+    def _save_financial_data_bulk(self, rows: List[Dict[str, Any]]):
+        """Save many financial data rows in a single transaction"""
+        try:
+            # Only changes to scored columns make a company due for rescoring
+            changed = changed_financial_inputs(self.db, rows)
+            
+            self.db.execute(insert(FinancialData), rows)
+            mark_companies_dirty(self.db, changed)
+            self.db.commit()
+            response_cache.invalidate(row['company_id'] for row in rows)
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving financial data in bulk: {e}")
+            raise
+    
     def get_financial_data(self, ticker: str, days: int = 30) -> Dict[str, Any]:
         """Get financial data for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
@@ -214,10 +441,7 @@ class FinancialService:
     def get_latest_financial_data(self, ticker: str) -> Optional[FinancialData]:
         """Get latest financial data for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
@@ -233,10 +457,7 @@ class FinancialService:
     def get_data_quality_metrics(self, ticker: str) -> Dict[str, Any]:
         """Get data quality metrics for financial data"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
@@ -287,4 +508,53 @@ class FinancialService:
             return None
 
 
+def _merge_price_history(ticker: str, cached: Optional[pd.DataFrame], frame: pd.DataFrame) -> pd.DataFrame:
+    """Merge newly downloaded bars into the cached series, keeping one year, and save it"""
+    combined = frame if cached is None else pd.concat([cached, frame])
+    combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+    
+    cutoff = combined.index[-1] - pd.DateOffset(years=1)
+    combined = combined[combined.index > cutoff]
+    _price_history.put(ticker, combined)
+    
+    if settings.price_history_dir:
+        try:
+            os.makedirs(settings.price_history_dir, exist_ok=True)
+            combined.to_parquet(_saved_prices_path(ticker))
+        except Exception as e:
+            logger.error(f"Error saving price history for {ticker}: {e}")
+    
+    return combined
+
 
+def _saved_prices_path(ticker: str) -> str:
+    """File holding a ticker's saved bars"""
+    return os.path.join(settings.price_history_dir, f"{ticker}.parquet")
+
+
+def _load_saved_prices(ticker: str) -> Optional[pd.DataFrame]:
+    """Load a ticker's saved bars into the cache, or None when there are none"""
+    if not settings.price_history_dir or not os.path.exists(_saved_prices_path(ticker)):
+        return None
+    
+    try:
+        bars = pd.read_parquet(_saved_prices_path(ticker))
+    except Exception as e:
+        logger.error(f"Error loading saved price history for {ticker}: {e}")
+        return None
+    
+    _price_history.put(ticker, bars)
+    return bars
+
+
+def evict_market_data(ticker: str):
+    """Forget a ticker's cached bars and fundamentals, e.g. when its company is deactivated"""
+    ticker = ticker.upper()
+    _price_history.pop(ticker)
+    _fundamentals.pop(ticker)
+    
+    if settings.price_history_dir:
+        try:
+            os.remove(_saved_prices_path(ticker))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,362 @@
+import argparse
+import json
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional, Set
+import logging
+from datetime import datetime
+
+from app.models.financial_data import FinancialData
+from app.models.news_event import NewsEvent
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.news_window import HIGH_RISK_EVENTS, NEGATIVE_SENTIMENT, NEWS_WINDOW_DAYS, NewsWindowStats
+
+logger = logging.getLogger(__name__)
+
+FINANCIAL_COLUMNS = [
+    'debt_to_equity', 'current_ratio', 'return_on_equity', 'revenue_growth',
+    'price_volatility', 'beta', 'market_cap'
+]
+NEWS_FEATURE_COLUMNS = [
+    'news_article_count', 'news_avg_sentiment', 'news_risk_penalty',
+    'news_negative_count', 'news_high_risk_count'
+]
+FEATURE_COLUMNS = FINANCIAL_COLUMNS + NEWS_FEATURE_COLUMNS
+
+# Outcome the model is trained on: a credit event reported in a company's news within
+# the horizon after an observation. It does not depend on any stored score.
+DISTRESS_EVENTS = ['default']
+OUTCOME_HORIZON_DAYS = 90
+
+
+def add_news_features(frame: pd.DataFrame, news: Dict[int, NewsWindowStats]) -> pd.DataFrame:
+    """Add rolling news window aggregates as model feature columns"""
+    windows = [news.get(company_id, NewsWindowStats()) for company_id in frame['company_id']]
+    frame['news_article_count'] = [float(window.article_count) for window in windows]
+    frame['news_avg_sentiment'] = [
+        window.avg_sentiment if window.article_count else np.nan for window in windows
+    ]
+    frame['news_risk_penalty'] = [float(window.risk_penalty) for window in windows]
+    frame['news_negative_count'] = [float(window.negative_count) for window in windows]
+    frame['news_high_risk_count'] = [float(window.high_risk_count) for window in windows]
+    return frame
+
+
+class WeightedAverageScorer:
+    """Overall score as a weighted average of the financial, market and news component scores"""
+    
+    method = "weighted_average"
+    model_version = "1.0"
+    
+    def __init__(self, financial_weight: float, market_weight: float, news_weight: float):
+        self.financial_weight = financial_weight
+        self.market_weight = market_weight
+        self.news_weight = news_weight
+    
+    def score(self, frame: pd.DataFrame) -> np.ndarray:
+        """Overall scores for a frame holding component score columns"""
+        return (
+            self.financial_weight * frame['financial_score'].to_numpy(dtype=float) +
+            self.market_weight * frame['market_score'].to_numpy(dtype=float) +
+            self.news_weight * frame['news_score'].to_numpy(dtype=float)
+        )
+
+
+class DistressModel:
+    """Trained XGBoost model of the probability of a distress event within the outcome horizon"""
+    
+    method = "xgboost"
+    
+    def __init__(self, booster: Any, model_version: str):
+        self.booster = booster
+        self.model_version = model_version
+    
+    def predict(self, frame: pd.DataFrame) -> np.ndarray:
+        """Distress probabilities for every row of a feature frame in one call"""
+        features = frame[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+        return self.booster.inplace_predict(features)
+    
+    def breakdown(self, probability: float) -> Dict[str, Any]:
+        """Score breakdown entry recording the model's prediction next to the stored score"""
+        return {'distress_model': self.model_version, 'distress_probability': float(probability)}
+
+
+class ModelCache:
+    """Per-process cache of loaded boosters keyed by model version"""
+    
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+        self._boosters: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+    
+    def model_path(self, version: str) -> str:
+        """Path of a model version's booster file"""
+        return os.path.join(self.model_dir, f"{version}.json")
+    
+    def get(self, version: str) -> Any:
+        """Get the booster for a model version, loading it from disk once"""
+        booster = self._boosters.get(version)
+        if booster is not None:
+            return booster
+        
+        with self._lock:
+            if version not in self._boosters:
+                path = self.model_path(version)
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"No model file for version {version} at {path}")
+                
+                # Imported here so the API never loads xgboost unless a model scorer is selected
+                import xgboost as xgb
+                
+                booster = xgb.Booster()
+                booster.load_model(path)
+                self._boosters[version] = booster
+                self.loads += 1
+                logger.info(f"Loaded scoring model {version} from {path}")
+            return self._boosters[version]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loaded model versions"""
+        with self._lock:
+            return {
+                'model_dir': self.model_dir,
+                'loaded_versions': sorted(self._boosters),
+                'loads': self.loads
+            }
+
+
+# Process-wide cache shared by all scoring services
+model_cache = ModelCache(model_dir=settings.model_dir)
+
+
+# Model versions that failed to load, reported once per process
+_unavailable_models: Set[str] = set()
+
+
+def get_scorer(financial_weight: float, market_weight: float, news_weight: float) -> WeightedAverageScorer:
+    """Scorer of the stored overall score, consistent with the component scores and explanations"""
+    return WeightedAverageScorer(financial_weight, market_weight, news_weight)
+
+
+def get_distress_model() -> Optional[DistressModel]:
+    """Distress model recorded next to each score when SCORING_ENGINE=xgboost, or None"""
+    if settings.scoring_engine != "xgboost":
+        return None
+    
+    version = settings.model_version
+    if version in _unavailable_models:
+        return None
+    
+    try:
+        return DistressModel(model_cache.get(version), version)
+    except Exception as e:
+        _unavailable_models.add(version)
+        logger.warning(f"Distress model {version or '(MODEL_VERSION unset)'} unavailable; "
+                       f"scores are stored without it until restart: {e}")
+        return None
+
+
+class ModelTrainingService:
+    """Trains the XGBoost distress model offline from stored financial data and news"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def build_training_frame(self, horizon_days: int = OUTCOME_HORIZON_DAYS,
+                             now: Optional[datetime] = None) -> pd.DataFrame:
+        """One row per company and day with financial data whose outcome horizon has passed:
+        features as of the observation and whether a distress event was reported within the horizon"""
+        horizon = pd.Timedelta(days=horizon_days)
+        cutoff = (now or datetime.now()) - horizon
+        
+        financials = self._read_frame(select(
+            FinancialData.company_id, FinancialData.date.label('observed_at'),
+            *[getattr(FinancialData, column) for column in FINANCIAL_COLUMNS]
+        ).where(FinancialData.date <= cutoff))
+        news = self._read_frame(select(
+            NewsEvent.company_id, NewsEvent.published_at,
+            NewsEvent.sentiment_score, NewsEvent.event_type, NewsEvent.risk_score
+        ).where(NewsEvent.published_at.isnot(None)))
+        
+        if financials.empty:
+            return pd.DataFrame(columns=['company_id', 'observed_at'] + FEATURE_COLUMNS + ['distress'])
+        
+        # Refreshes store several rows a day; the last one stands for the day
+        financials['observed_at'] = pd.to_datetime(financials['observed_at'])
+        frame = financials.sort_values('observed_at').groupby(
+            ['company_id', financials['observed_at'].dt.date]
+        ).tail(1).reset_index(drop=True)
+        frame[FINANCIAL_COLUMNS] = frame[FINANCIAL_COLUMNS].astype(float)
+        
+        if not news.empty:
+            news['published_at'] = pd.to_datetime(news['published_at'])
+        
+        frame = self._add_outcomes(frame, news, horizon)
+        return self._add_windowed_news_features(frame, news).reset_index(drop=True)
+    
+    def _add_outcomes(self, frame: pd.DataFrame, news: pd.DataFrame, horizon: pd.Timedelta) -> pd.DataFrame:
+        """Label each observation 1 when a distress event is reported in (observed_at, observed_at + horizon]"""
+        frame['distress'] = 0.0
+        if news.empty:
+            return frame
+        
+        events = news[news['event_type'].isin(DISTRESS_EVENTS)].sort_values('published_at')
+        for company_id, rows in frame.groupby('company_id'):
+            times = events.loc[events['company_id'] == company_id, 'published_at'].to_numpy()
+            if not len(times):
+                continue
+            
+            after = np.searchsorted(times, rows['observed_at'].to_numpy(), side='right')
+            until = np.searchsorted(times, (rows['observed_at'] + horizon).to_numpy(), side='right')
+            frame.loc[rows.index, 'distress'] = (until > after).astype(float)
+        
+        return frame
+    
+    def _add_windowed_news_features(self, frame: pd.DataFrame, news: pd.DataFrame) -> pd.DataFrame:
+        """News window aggregates ending at each observation, from per-company prefix sums"""
+        for column in NEWS_FEATURE_COLUMNS:
+            frame[column] = 0.0
+        frame['news_avg_sentiment'] = np.nan
+        if news.empty:
+            return frame
+        
+        sentiment = news['sentiment_score'].fillna(0.0).astype(float)
+        high_risk = news['event_type'].isin(HIGH_RISK_EVENTS)
+        news = news.assign(
+            sentiment=sentiment,
+            penalty=np.where(high_risk, 10, np.where(news['risk_score'].fillna(0.0) > 0.7, 5, 0)),
+            negative=(sentiment < NEGATIVE_SENTIMENT).astype(int),
+            high_risk=high_risk.astype(int)
+        ).sort_values('published_at')
+        
+        window = pd.Timedelta(days=NEWS_WINDOW_DAYS)
+        for company_id, rows in frame.groupby('company_id'):
+            articles = news[news['company_id'] == company_id]
+            if articles.empty:
+                continue
+            
+            times = articles['published_at'].to_numpy()
+            sums = {
+                column: np.concatenate([[0.0], np.cumsum(articles[column].to_numpy(dtype=float))])
+                for column in ('sentiment', 'penalty', 'negative', 'high_risk')
+            }
+            ends = np.searchsorted(times, rows['observed_at'].to_numpy(), side='right')
+            starts = np.searchsorted(times, (rows['observed_at'] - window).to_numpy(), side='left')
+            counts = (ends - starts).astype(float)
+            
+            frame.loc[rows.index, 'news_article_count'] = counts
+            frame.loc[rows.index, 'news_avg_sentiment'] = np.where(
+                counts > 0, (sums['sentiment'][ends] - sums['sentiment'][starts]) / np.maximum(counts, 1), np.nan
+            )
+            frame.loc[rows.index, 'news_risk_penalty'] = sums['penalty'][ends] - sums['penalty'][starts]
+            frame.loc[rows.index, 'news_negative_count'] = sums['negative'][ends] - sums['negative'][starts]
+            frame.loc[rows.index, 'news_high_risk_count'] = sums['high_risk'][ends] - sums['high_risk'][starts]
+        
+        return frame
+    
+    def _read_frame(self, statement) -> pd.DataFrame:
+        """Run a select into a data frame"""
+        result = self.db.execute(statement)
+        return pd.DataFrame(result.all(), columns=list(result.keys()))
+    
+    def train(self, version: Optional[str] = None, rounds: int = 200, max_depth: int = 4,
+              learning_rate: float = 0.1, holdout: float = 0.2, seed: int = 42,
+              horizon_days: int = OUTCOME_HORIZON_DAYS) -> Dict[str, Any]:
+        """Train a booster, write it to the model directory and return its metadata"""
+        import xgboost as xgb
+        
+        frame = self.build_training_frame(horizon_days)
+        if len(frame) < 10:
+            raise ValueError(f"Not enough financial history with an elapsed outcome horizon ({len(frame)} rows)")
+        if frame['distress'].nunique() < 2:
+            raise ValueError("Training needs observations both with and without a later distress event")
+        
+        version = version or f"xgb-{datetime.now():%Y%m%d%H%M}"
+        start = time.perf_counter()
+        
+        # Hold out whole companies so the evaluation is not flattered by near-duplicate rows
+        rng = np.random.default_rng(seed)
+        companies = frame['company_id'].unique()
+        held_out = set(rng.choice(companies, size=max(1, int(len(companies) * holdout)), replace=False))
+        is_holdout = frame['company_id'].isin(held_out).to_numpy()
+        if is_holdout.all():
+            is_holdout[:] = False
+        
+        features = frame[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+        labels = frame['distress'].to_numpy(dtype=np.float32)
+        train = xgb.DMatrix(features[~is_holdout], label=labels[~is_holdout], feature_names=FEATURE_COLUMNS)
+        evals = [(train, 'train')]
+        if is_holdout.any():
+            evals.append((xgb.DMatrix(features[is_holdout], label=labels[is_holdout], feature_names=FEATURE_COLUMNS), 'holdout'))
+        
+        history: Dict[str, Dict[str, List[float]]] = {}
+        booster = xgb.train(
+            {
+                'objective': 'binary:logistic',
+                'max_depth': max_depth,
+                'eta': learning_rate,
+                'eval_metric': 'logloss',
+                'seed': seed
+            },
+            train,
+            num_boost_round=rounds,
+            evals=evals,
+            evals_result=history,
+            verbose_eval=False
+        )
+        
+        os.makedirs(model_cache.model_dir, exist_ok=True)
+        path = model_cache.model_path(version)
+        booster.save_model(path)
+        
+        metadata = {
+            'model_version': version,
+            'trained_at': datetime.now().isoformat(),
+            'features': FEATURE_COLUMNS,
+            'label': f"{'/'.join(DISTRESS_EVENTS)} event reported within {horizon_days} days",
+            'horizon_days': horizon_days,
+            'positive_rate': float(labels.mean()),
+            'training_rows': int((~is_holdout).sum()),
+            'holdout_rows': int(is_holdout.sum()),
+            'train_logloss': history['train']['logloss'][-1],
+            'holdout_logloss': history['holdout']['logloss'][-1] if 'holdout' in history else None,
+            'rounds': rounds,
+            'duration_seconds': time.perf_counter() - start
+        }
+        with open(os.path.join(model_cache.model_dir, f"{version}.meta.json"), 'w') as handle:
+            json.dump(metadata, handle, indent=2)
+        
+        logger.info(f"Trained scoring model {version} on {metadata['training_rows']} rows, saved to {path}")
+        return metadata
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    
+    parser = argparse.ArgumentParser(description="Train the XGBoost distress model")
+    parser.add_argument('--version', default=None, help="model version to write (default: xgb-<timestamp>)")
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--max-depth', type=int, default=4)
+    parser.add_argument('--learning-rate', type=float, default=0.1)
+    parser.add_argument('--horizon-days', type=int, default=OUTCOME_HORIZON_DAYS)
+    args = parser.parse_args()
+    
+    session = SessionLocal()
+    try:
+        trained = ModelTrainingService(session).train(
+            args.version, rounds=args.rounds, max_depth=args.max_depth, learning_rate=args.learning_rate,
+            horizon_days=args.horizon_days
+        )
+    finally:
+        session.close()
+    
+    print(json.dumps(trained, indent=2))
+    print(f"Set SCORING_ENGINE=xgboost and MODEL_VERSION={trained['model_version']} "
+          f"to record its distress probability with each score")
@@ -0,0 +1,218 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+import logging
+from datetime import datetime
+
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.services.company_cache import company_cache
+from app.services.news_service import NewsService
+
+logger = logging.getLogger(__name__)
+
+# Analyzer state of a pool worker process, built once by the pool initializer
+_worker_service: Optional[NewsService] = None
+
+
+def _init_worker():
+    """Load the VADER lexicon and compile the keyword matcher once per worker process"""
+    global _worker_service
+    _worker_service = NewsService(db=None)
+
+
+def _analyze_texts(texts: List[str]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Sentiment and event classification for a chunk of article texts, run in a worker process"""
+    return [(_worker_service._analyze_sentiment(text), _worker_service._classify_events(text)) for text in texts]
+
+
+def _chunks(articles: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Split an article stream into lists of at most `size` articles"""
+    iterator = iter(articles)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class NewsBackfillService:
+    """Streams historical articles through a process pool of analyzers and stores them in batches"""
+    
+    def __init__(self, db: Session, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        self.db = db
+        self.news_service = NewsService(db)
+        self.workers = workers or settings.news_backfill_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or settings.news_backfill_chunk_size
+    
+    def backfill(self, ticker: str, articles: Iterable[Dict],
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Analyze articles in worker processes and write each chunk in one transaction"""
+        company = company_cache.get(self.db, ticker)
+        if not company:
+            raise ValueError(f"Company with ticker {ticker} not found or inactive")
+        
+        stats = {
+            'ticker': company.ticker,
+            'articles_received': 0,
+            'articles_processed': 0,
+            'articles_skipped': 0,
+            'chunks_completed': 0,
+            'articles_per_second': 0.0
+        }
+        start = time.perf_counter()
+        
+        # Spawned workers never inherit the parent's database connections or threads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_init_worker) as pool:
+            pending: Deque[Tuple[List[Dict], int, Future]] = deque()
+            
+            for chunk in _chunks(articles, self.chunk_size):
+                stats['articles_received'] += len(chunk)
+                
+                new_articles = self.news_service._filter_new_articles(company.id, chunk)
+                texts = [self.news_service._article_text(article) for article in new_articles]
+                pending.append((new_articles, len(chunk), pool.submit(_analyze_texts, texts)))
+                
+                # Keep a bounded number of chunks in flight so the stream is never fully buffered
+                if len(pending) >= 2 * self.workers:
+                    self._store_chunk(company.id, *pending.popleft(), stats, start, progress)
+            
+            while pending:
+                self._store_chunk(company.id, *pending.popleft(), stats, start, progress)
+        
+        stats['duration_seconds'] = time.perf_counter() - start
+        logger.info(
+            f"Backfilled {stats['articles_processed']} news articles for {company.ticker} "
+            f"({stats['articles_skipped']} skipped) in {stats['duration_seconds']:.1f}s"
+        )
+        return stats
+    
+    def _store_chunk(self, company_id: int, articles: List[Dict], received: int, analysis: Future,
+                     stats: Dict[str, Any], start: float, progress: Optional[Callable[[Dict[str, Any]], None]]):
+        """Insert one analyzed chunk and report progress"""
+        mappings = []
+        for article, (sentiment_data, event_data) in zip(articles, analysis.result()):
+            try:
+                mappings.append(self.news_service._news_event_mapping(company_id, article, sentiment_data, event_data))
+            except Exception as e:
+                logger.error(f"Error processing backfilled article '{article.get('title')}': {e}")
+                continue
+        
+        processed = self.news_service._insert_news_events(mappings)
+        
+        stats['articles_processed'] += processed
+        stats['articles_skipped'] += received - processed
+        stats['chunks_completed'] += 1
+        stats['articles_per_second'] = (
+            (stats['articles_processed'] + stats['articles_skipped']) / (time.perf_counter() - start)
+        )
+        
+        logger.info(
+            f"Backfill {stats['ticker']}: chunk {stats['chunks_completed']}, "
+            f"{stats['articles_processed']} stored, {stats['articles_skipped']} skipped"
+        )
+        if progress:
+            progress(dict(stats))
+
+
+class BackfillJobs:
+    """Progress of backfills started through the API in this process"""
+    
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def create(self, ticker: str, articles_total: int) -> str:
+        """Register a queued backfill and return its id"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'ticker': ticker.upper(),
+                'status': 'queued',
+                'articles_total': articles_total,
+                'created_at': datetime.now(),
+                'finished_at': None,
+                'error': None
+            }
+        return job_id
+    
+    def update(self, job_id: str, **fields):
+        """Merge progress fields into a job"""
+        with self._lock:
+            self._jobs[job_id].update(fields)
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a snapshot of a job, or None if it is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+# Process-wide registry read by the progress endpoint
+backfill_jobs = BackfillJobs()
+
+
+def run_news_backfill(job_id: str, ticker: str, articles: List[Dict]):
+    """Run an API-started backfill in a dedicated session, recording progress on the job"""
+    db = SessionLocal()
+    try:
+        backfill_jobs.update(job_id, status='running')
+        result = NewsBackfillService(db).backfill(
+            ticker, articles, progress=lambda stats: backfill_jobs.update(job_id, **stats)
+        )
+        backfill_jobs.update(job_id, status='completed', finished_at=datetime.now(), **result)
+    except Exception as e:
+        logger.error(f"News backfill {job_id} for {ticker} failed: {e}")
+        backfill_jobs.update(job_id, status='failed', finished_at=datetime.now(), error=str(e))
+    finally:
+        db.close()
+
+
+def read_articles(path: str) -> Iterator[Dict]:
+    """Articles from a JSON Lines file (streamed), a JSON array, or a NewsAPI response document"""
+    with open(path, encoding='utf-8') as handle:
+        if path.endswith('.jsonl'):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        
+        document = json.load(handle)
+    
+    yield from document.get('articles', []) if isinstance(document, dict) else document
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    
+    parser = argparse.ArgumentParser(description="Backfill historical news articles for a company")
+    parser.add_argument('ticker')
+    parser.add_argument('path', help="NewsAPI-format articles: .jsonl, a JSON array or a NewsAPI response")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    args = parser.parse_args()
+    
+    session = SessionLocal()
+    try:
+        summary = NewsBackfillService(session, args.workers, args.chunk_size).backfill(
+            args.ticker, read_articles(args.path)
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        session.close()
+    
+    print(json.dumps(summary, indent=2))
@@ -1,83 +1,71 @@
-import requests
+import httpx
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
 import json
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import re
 
 from app.models.company import Company
-from app.models.news_event import NewsEvent
+from app.models.news_event import DEDUP_COLUMNS, NewsEvent, article_url_hash
 from app.core.config import settings
+from app.core.bloom import BloomFilter
+from app.core.database import dialect_insert
+from app.core.executors import run_blocking
+from app.core.http_client import get_json
+from app.services.sentiment_cache import sentiment_cache
+from app.services.company_cache import company_cache
+from app.services.dirty_tracking import mark_companies_dirty
+from app.services.response_cache import response_cache
+from app.services.news_window import news_window
+from app.services.alert_service import AlertService
+from app.services.partitions import partitions
+from app.services.text_analyzers import EVENT_KEYWORDS, get_event_matcher, get_sentiment_analyzer
 
 logger = logging.getLogger(__name__)
 
+NON_WORD_CHARACTERS = re.compile(r'[^\w\s]')
+
 
 class NewsService:
     """Service for fetching and processing news data"""
     
     def __init__(self, db: Session):
         self.db = db
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
+        self.sentiment_analyzer = get_sentiment_analyzer()
         self.news_api_key = settings.news_api_key
         
-        # Event classification keywords
-        self.event_keywords = {
-            'default': ['default', 'bankruptcy', 'insolvency', 'liquidation', 'chapter 11'],
-            'merger': ['merger', 'acquisition', 'takeover', 'buyout', 'consolidation'],
-            'restructuring': ['restructuring', 'reorganization', 'layoffs', 'cost cutting'],
-            'earnings': ['earnings', 'profit', 'loss', 'quarterly results', 'financial results'],
-            'debt': ['debt', 'bond', 'credit rating', 'downgrade', 'upgrade'],
-            'legal': ['lawsuit', 'litigation', 'regulatory', 'investigation', 'fine'],
-            'management': ['ceo', 'executive', 'leadership', 'resignation', 'appointment']
-        }
+        self.event_keywords = EVENT_KEYWORDS
+        self.event_matcher = get_event_matcher()
+        self.alert_service = AlertService(db)
     
-    async def fetch_news_data(self, ticker: str) -> Dict[str, Any]:
+    async def fetch_news_data(self, ticker: str, seen_urls: Optional[BloomFilter] = None) -> Dict[str, Any]:
         """Fetch news data from NewsAPI"""
         try:
             # Check if company exists
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = await run_blocking(company_cache.get, self.db, ticker)
             
             if not company:
                 raise ValueError(f"Company with ticker {ticker} not found or inactive")
             
             if not self.news_api_key:
                 logger.warning("NewsAPI key not configured, using mock data")
-                return await self._fetch_mock_news_data(ticker, company.id)
+                return await self._fetch_mock_news_data(ticker, company.id, seen_urls)
             
             # Fetch news from NewsAPI
-            news_data = self._fetch_from_newsapi(ticker, company.name)
-            
-            # Process and save news articles
-            processed_count = 0
-            for article in news_data.get('articles', []):
-                try:
-                    # Analyze sentiment
-                    sentiment_data = self._analyze_sentiment(article['title'] + ' ' + (article.get('description', '')))
-                    
-                    # Classify events
-                    event_data = self._classify_events(article['title'] + ' ' + (article.get('description', '')))
-                    
-                    # Save to database
-                    self._save_news_event(company.id, article, sentiment_data, event_data)
-                    processed_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error processing news article for {ticker}: {e}")
-                    continue
-            
-            logger.info(f"Successfully processed {processed_count} news articles for {ticker}")
-            return {"status": "success", "ticker": ticker, "articles_processed": processed_count}
+            news_data = await self._fetch_from_newsapi(ticker, company.name)
+            
+            # Deduplication, analysis and the insert are blocking; keep them off the event loop
+            return await run_blocking(
+                self._store_articles, ticker, company.id, news_data.get('articles', []), seen_urls
+            )
             
         except Exception as e:
             logger.error(f"Error fetching news data for {ticker}: {e}")
             raise
     
-    def _fetch_from_newsapi(self, ticker: str, company_name: str) -> Dict[str, Any]:
+    async def _fetch_from_newsapi(self, ticker: str, company_name: str) -> Dict[str, Any]:
         """Fetch news from NewsAPI"""
         try:
             # Search for both ticker and company name
@@ -88,20 +76,18 @@ class NewsService:
                 'q': query,
                 'language': 'en',
                 'sortBy': 'publishedAt',
-                'pageSize': 50,
-                'apiKey': self.news_api_key
+                'pageSize': 50
             }
             
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            return response.json()
+            # Send the key as a header so it never appears in logged URLs
+            return await get_json(url, params=params, headers={'X-Api-Key': self.news_api_key})
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching from NewsAPI: {e}")
             raise
     
-    async def _fetch_mock_news_data(self, ticker: str, company_id: int) -> Dict[str, Any]:
+    async def _fetch_mock_news_data(self, ticker: str, company_id: int,
+                                    seen_urls: Optional[BloomFilter] = None) -> Dict[str, Any]:
         """Fetch mock news data for testing"""
         try:
             mock_articles = [
@@ -128,28 +114,119 @@ class NewsService:
                 }
             ]
             
-            processed_count = 0
-            for article in mock_articles:
-                try:
-                    sentiment_data = self._analyze_sentiment(article['title'] + ' ' + article['description'])
-                    event_data = self._classify_events(article['title'] + ' ' + article['description'])
-                    self._save_news_event(company_id, article, sentiment_data, event_data)
-                    processed_count += 1
-                except Exception as e:
-                    logger.error(f"Error processing mock article: {e}")
-                    continue
-            
-            return {"status": "success", "ticker": ticker, "articles_processed": processed_count}
+            return await run_blocking(self._store_articles, ticker, company_id, mock_articles, seen_urls)
             
         except Exception as e:
             logger.error(f"Error fetching mock news data: {e}")
             raise
     
+    def build_seen_filter(self) -> BloomFilter:
+        """Build a Bloom filter of the article keys stored within the deduplication window"""
+        cutoff_date = datetime.now() - timedelta(days=settings.news_dedup_window_days)
+        rows = self.db.query(NewsEvent.company_id, NewsEvent.url_hash).filter(
+            NewsEvent.published_at >= cutoff_date,
+            NewsEvent.url_hash.isnot(None)
+        ).all()
+        
+        # Leave room for the articles added during the run
+        seen_urls = BloomFilter(capacity=2 * len(rows) + 1000)
+        for company_id, url_hash in rows:
+            seen_urls.add(self._seen_key(company_id, url_hash))
+        
+        return seen_urls
+    
+    def _url_hash(self, article: Dict) -> str:
+        """Stable article identity: the URL, or headline and source when there is none"""
+        return article_url_hash(article.get('url'), article.get('title'), (article.get('source') or {}).get('name'))
+    
+    def _seen_key(self, company_id: int, url_hash: str) -> str:
+        """Bloom filter key for a company's article"""
+        return f"{company_id}:{url_hash}"
+    
+    def _filter_new_articles(self, company_id: int, articles: List[Dict],
+                             seen_urls: Optional[BloomFilter] = None) -> List[Dict]:
+        """Drop articles already stored for the company or repeated within the batch"""
+        hashes = [self._url_hash(article) for article in articles]
+        
+        # Bloom filter hits may be false positives, so only they are checked against the table
+        if seen_urls is None:
+            candidates = set(hashes)
+        else:
+            candidates = {h for h in hashes if self._seen_key(company_id, h) in seen_urls}
+        
+        stored = set()
+        if candidates:
+            stored = {
+                row.url_hash for row in self.db.query(NewsEvent.url_hash).filter(
+                    NewsEvent.company_id == company_id,
+                    NewsEvent.url_hash.in_(candidates)
+                )
+            }
+        
+        new_articles = []
+        for article, url_hash in zip(articles, hashes):
+            if url_hash in stored:
+                continue
+            
+            stored.add(url_hash)
+            if seen_urls is not None:
+                seen_urls.add(self._seen_key(company_id, url_hash))
+            new_articles.append(article)
+        
+        return new_articles
+    
+    def _store_articles(self, ticker: str, company_id: int, articles: List[Dict],
+                        seen_urls: Optional[BloomFilter] = None) -> Dict[str, Any]:
+        """Analyze and store the articles not yet stored for a company"""
+        new_articles = self._filter_new_articles(company_id, articles, seen_urls)
+        
+        # Analyze sentiment and classify events, reusing cached results
+        analyses = self._analyze_articles(new_articles)
+        
+        mappings = []
+        for article, (sentiment_data, event_data) in zip(new_articles, analyses):
+            try:
+                mappings.append(self._news_event_mapping(company_id, article, sentiment_data, event_data))
+            except Exception as e:
+                logger.error(f"Error processing news article for {ticker}: {e}")
+                continue
+        
+        processed_count = self._insert_news_events(mappings)
+        skipped_count = len(articles) - processed_count
+        
+        logger.info(f"Successfully processed {processed_count} news articles for {ticker} ({skipped_count} skipped)")
+        return {
+            "status": "success",
+            "ticker": ticker,
+            "articles_processed": processed_count,
+            "articles_skipped": skipped_count
+        }
+    
+    def _article_text(self, article: Dict) -> str:
+        """Text used for sentiment analysis and event classification"""
+        return (article.get('title') or '') + ' ' + (article.get('description') or '')
+    
+    def _analyze_articles(self, articles: List[Dict]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Analyze sentiment and classify events for articles, skipping texts seen before"""
+        texts = [self._article_text(article) for article in articles]
+        keys = [sentiment_cache.key(text) for text in texts]
+        
+        cached = sentiment_cache.get_many(self.db, keys)
+        computed = {}
+        
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in computed:
+                computed[key] = (self._analyze_sentiment(text), self._classify_events(text))
+        
+        sentiment_cache.put_many(self.db, computed)
+        
+        return [cached.get(key) or computed[key] for key in keys]
+    
     def _analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment using VADER"""
         try:
             # Clean text
-            clean_text = re.sub(r'[^\w\s]', '', text.lower())
+            clean_text = NON_WORD_CHARACTERS.sub('', text.lower())
             
             # Get sentiment scores
             scores = self.sentiment_analyzer.polarity_scores(clean_text)
@@ -184,16 +261,8 @@ class NewsService:
     def _classify_events(self, text: str) -> Dict[str, Any]:
         """Classify news events based on keywords"""
         try:
-            text_lower = text.lower()
-            detected_events = []
-            keywords_found = []
-            
-            for event_type, keywords in self.event_keywords.items():
-                for keyword in keywords:
-                    if keyword in text_lower:
-                        detected_events.append(event_type)
-                        keywords_found.append(keyword)
-                        break  # Only count each event type once
+            # Each event type counts once, with its first listed keyword
+            detected_events, keywords_found = self.event_matcher.match(text.lower())
             
             # Calculate confidence based on keyword matches
             confidence = min(1.0, len(keywords_found) * 0.3)
@@ -212,42 +281,106 @@ class NewsService:
                 'keywords': []
             }
     
-    def _save_news_event(self, company_id: int, article: Dict, sentiment_data: Dict, event_data: Dict):
-        """Save news event to database"""
+    def _save_news_event(self, company_id: int, article: Dict, sentiment_data: Dict, event_data: Dict) -> bool:
+        """Save news event to database unless the article is already stored"""
+        return self._insert_news_events(
+            [self._news_event_mapping(company_id, article, sentiment_data, event_data)]
+        ) > 0
+    
+    def _news_event_mapping(self, company_id: int, article: Dict, sentiment_data: Dict,
+                            event_data: Dict) -> Dict[str, Any]:
+        """Build a news event row from an analyzed article"""
+        # Calculate risk score based on sentiment and events
+        risk_score = self._calculate_risk_score(sentiment_data, event_data)
+        risk_factors = self._identify_risk_factors(sentiment_data, event_data)
+        
+        return {
+            'company_id': company_id,
+            'headline': article['title'],
+            'summary': article.get('description'),
+            'content': article.get('content'),
+            'url': article.get('url'),
+            'url_hash': self._url_hash(article),
+            'source': (article.get('source') or {}).get('name'),
+            'published_at': datetime.fromisoformat(article['publishedAt'].replace('Z', '+00:00')),
+            'sentiment_score': sentiment_data['sentiment_score'],
+            'sentiment_label': sentiment_data['sentiment_label'],
+            'positive_score': sentiment_data['positive_score'],
+            'negative_score': sentiment_data['negative_score'],
+            'neutral_score': sentiment_data['neutral_score'],
+            'event_type': event_data['event_type'],
+            'event_confidence': event_data['event_confidence'],
+            'keywords': event_data['keywords'],
+            'risk_score': risk_score,
+            'risk_factors': risk_factors,
+            'data_source': 'newsapi'
+        }
+    
+    def _insert_news_events(self, mappings: List[Dict[str, Any]]) -> int:
+        """Insert news events in one transaction, skipping stored articles; returns the number inserted"""
+        if not mappings:
+            return 0
+        
+        # Core insert on the table: the ORM bulk path splits the batch whenever the set of
+        # None-valued columns changes (e.g. unclassified articles), costing a statement per run
+        table = NewsEvent.__table__
+        statement = dialect_insert(table).on_conflict_do_nothing(
+            index_elements=DEDUP_COLUMNS
+        ).returning(
+            table.c.id,
+            table.c.company_id,
+            table.c.published_at,
+            table.c.sentiment_score,
+            table.c.event_type,
+            table.c.risk_score,
+            table.c.headline,
+            table.c.url,
+            table.c.keywords
+        )
+        
         try:
-            # Calculate risk score based on sentiment and events
-            risk_score = self._calculate_risk_score(sentiment_data, event_data)
-            risk_factors = self._identify_risk_factors(sentiment_data, event_data)
-            
-            news_event = NewsEvent(
-                company_id=company_id,
-                headline=article['title'],
-                summary=article.get('description'),
-                content=article.get('content'),
-                url=article.get('url'),
-                source=article.get('source', {}).get('name'),
-                published_at=datetime.fromisoformat(article['publishedAt'].replace('Z', '+00:00')),
-                sentiment_score=sentiment_data['sentiment_score'],
-                sentiment_label=sentiment_data['sentiment_label'],
-                positive_score=sentiment_data['positive_score'],
-                negative_score=sentiment_data['negative_score'],
-                neutral_score=sentiment_data['neutral_score'],
-                event_type=event_data['event_type'],
-                event_confidence=event_data['event_confidence'],
-                keywords=event_data['keywords'],
-                risk_score=risk_score,
-                risk_factors=risk_factors,
-                data_source='newsapi'
-            )
-            
-            self.db.add(news_event)
+            # Backfilled articles may fall in months without a partition yet
+            partitions.ensure(self.db, 'news_events', (mapping['published_at'] for mapping in mappings))
+            
+            try:
+                with self.db.begin_nested():
+                    inserted = self.db.execute(statement, mappings).all()
+            except Exception as e:
+                logger.warning(f"Batch insert of {len(mappings)} news events failed, retrying row by row: {e}")
+                inserted = self._insert_news_events_individually(statement, mappings)
+            
+            # New articles change the news score
+            company_ids = [row.company_id for row in inserted]
+            mark_companies_dirty(self.db, company_ids)
+            
+            # High-risk articles raise alerts in the same transaction; backfilled history is too old to alert on
+            self.alert_service.insert_alerts(self.alert_service.evaluate_news_events(
+                inserted, published_after=datetime.now() - timedelta(seconds=settings.alert_time_window)
+            ))
             self.db.commit()
             
+            news_window.add(inserted)
+            response_cache.invalidate(company_ids)
+            return len(inserted)
+            
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error saving news event: {e}")
+            logger.error(f"Error saving news events: {e}")
             raise
     
+    def _insert_news_events_individually(self, statement, mappings: List[Dict[str, Any]]) -> List[Any]:
+        """Insert rows under one savepoint each so only the failing rows are rolled back"""
+        inserted = []
+        for mapping in mappings:
+            try:
+                with self.db.begin_nested():
+                    inserted.extend(self.db.execute(statement, [mapping]).all())
+            except Exception as e:
+                logger.error(f"Error saving news event '{mapping.get('headline')}': {e}")
+                continue
+        
+        return inserted
+    
     def _calculate_risk_score(self, sentiment_data: Dict, event_data: Dict) -> float:
         """Calculate risk score based on sentiment and events"""
         try:
@@ -299,10 +432,7 @@ class NewsService:
     def get_news_data(self, ticker: str, days: int = 7, limit: int = 50) -> Dict[str, Any]:
         """Get news data for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
@@ -349,10 +479,7 @@ class NewsService:
     def get_latest_news(self, ticker: str) -> Optional[NewsEvent]:
         """Get latest news for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
@@ -368,47 +495,50 @@ class NewsService:
     def get_sentiment_summary(self, ticker: str, days: int = 7) -> Dict[str, Any]:
         """Get sentiment analysis summary for company news"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
             
-            # Get news for the specified period
+            # Count and score totals per sentiment label, aggregated in the database
             cutoff_date = datetime.now() - timedelta(days=days)
-            news_events = self.db.query(NewsEvent).filter(
+            label_rows = self.db.query(
+                NewsEvent.sentiment_label,
+                func.count(NewsEvent.id),
+                func.count(NewsEvent.sentiment_score),
+                func.sum(NewsEvent.sentiment_score)
+            ).filter(
                 NewsEvent.company_id == company.id,
                 NewsEvent.published_at >= cutoff_date
-            ).all()
+            ).group_by(NewsEvent.sentiment_label).all()
             
-            if not news_events:
+            total_articles = sum(row[1] for row in label_rows)
+            if not total_articles:
                 return None
             
-            # Calculate sentiment statistics
-            sentiment_scores = [event.sentiment_score for event in news_events]
-            sentiment_labels = [event.sentiment_label for event in news_events]
+            label_counts = {label: count for label, count, _, _ in label_rows}
+            scored_count = sum(row[2] for row in label_rows)
+            score_total = sum(row[3] or 0.0 for row in label_rows)
             
-            positive_count = sentiment_labels.count('positive')
-            negative_count = sentiment_labels.count('negative')
-            neutral_count = sentiment_labels.count('neutral')
+            positive_count = label_counts.get('positive', 0)
+            negative_count = label_counts.get('negative', 0)
+            neutral_count = label_counts.get('neutral', 0)
             
             return {
                 'ticker': ticker,
                 'company_name': company.name,
                 'period_days': days,
-                'total_articles': len(news_events),
-                'average_sentiment': sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0,
+                'total_articles': total_articles,
+                'average_sentiment': score_total / scored_count if scored_count else 0,
                 'sentiment_distribution': {
                     'positive': positive_count,
                     'negative': negative_count,
                     'neutral': neutral_count
                 },
                 'sentiment_percentages': {
-                    'positive': positive_count / len(news_events) * 100 if news_events else 0,
-                    'negative': negative_count / len(news_events) * 100 if news_events else 0,
-                    'neutral': neutral_count / len(news_events) * 100 if news_events else 0
+                    'positive': positive_count / total_articles * 100,
+                    'negative': negative_count / total_articles * 100,
+                    'neutral': neutral_count / total_articles * 100
                 }
             }
             
@@ -419,16 +549,20 @@ class NewsService:
     def get_news_events(self, ticker: str, days: int = 7, event_type: Optional[str] = None) -> Dict[str, Any]:
         """Get classified news events for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
             
-            # Build query
-            query = self.db.query(NewsEvent).filter(
+            # Select only the listed columns, never article bodies
+            query = self.db.query(
+                NewsEvent.id,
+                NewsEvent.headline,
+                NewsEvent.published_at,
+                NewsEvent.sentiment_score,
+                NewsEvent.risk_score,
+                NewsEvent.event_type
+            ).filter(
                 NewsEvent.company_id == company.id,
                 NewsEvent.published_at >= datetime.now() - timedelta(days=days)
             )
@@ -473,7 +607,16 @@ class NewsService:
         try:
             # Get recent news with high risk scores or negative sentiment
             cutoff_date = datetime.now() - timedelta(days=1)
-            trending_news = self.db.query(NewsEvent).filter(
+            # Company columns come from the join, not a lazy load per article
+            trending_news = self.db.query(
+                NewsEvent.headline,
+                NewsEvent.published_at,
+                NewsEvent.sentiment_score,
+                NewsEvent.event_type,
+                NewsEvent.risk_score,
+                Company.ticker,
+                Company.name.label('company_name')
+            ).join(Company, Company.id == NewsEvent.company_id).filter(
                 NewsEvent.published_at >= cutoff_date,
                 (NewsEvent.risk_score > 0.5) | (NewsEvent.sentiment_score < -0.3)
             ).order_by(NewsEvent.risk_score.desc(), NewsEvent.published_at.desc()).limit(limit).all()
@@ -481,8 +624,8 @@ class NewsService:
             news_list = []
             for event in trending_news:
                 news_dict = {
-                    'ticker': event.company.ticker,
-                    'company_name': event.company.name,
+                    'ticker': event.ticker,
+                    'company_name': event.company_name,
                     'headline': event.headline,
                     'published_at': event.published_at.isoformat(),
                     'sentiment_score': event.sentiment_score,
@@ -504,10 +647,7 @@ class NewsService:
     def get_data_quality_metrics(self, ticker: str) -> Dict[str, Any]:
         """Get data quality metrics for news data"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
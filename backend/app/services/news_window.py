@@ -0,0 +1,217 @@
+import heapq
+import threading
+import time
+from collections import Counter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Set, Tuple
+import logging
+from datetime import datetime, timedelta
+
+from app.models.news_event import NewsEvent
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NEWS_WINDOW_DAYS = 7
+HIGH_RISK_EVENTS = ['default', 'legal', 'restructuring']
+NEGATIVE_SENTIMENT = -0.3
+LOAD_CHUNK_SIZE = 500
+
+# (published_at, event id, sentiment score, event type, risk score)
+WindowEntry = Tuple[datetime, int, float, Optional[str], float]
+
+
+class NewsWindowStats(NamedTuple):
+    """Aggregates over a company's articles in the scoring window"""
+    article_count: int = 0
+    sentiment_sum: float = 0.0
+    risk_penalty: int = 0
+    negative_count: int = 0
+    high_risk_events: Dict[str, int] = {}
+    
+    @property
+    def avg_sentiment(self) -> Optional[float]:
+        return self.sentiment_sum / self.article_count if self.article_count else None
+    
+    @property
+    def high_risk_count(self) -> int:
+        return sum(self.high_risk_events.values())
+
+
+def _risk_points(event_type: Optional[str], risk_score: float) -> int:
+    """Penalty points one article adds to the news score"""
+    if event_type in HIGH_RISK_EVENTS:
+        return 10
+    if risk_score > 0.7:
+        return 5
+    return 0
+
+
+class CompanyNewsWindow:
+    """Running sums over one company's articles, expired in publication order"""
+    
+    def __init__(self, loaded_at: float):
+        self.loaded_at = loaded_at
+        self._heap: List[WindowEntry] = []
+        self._ids: Set[int] = set()
+        self.sentiment_sum = 0.0
+        self.risk_penalty = 0
+        self.negative_count = 0
+        self.high_risk_events: Counter = Counter()
+    
+    def add(self, entry: WindowEntry):
+        """Add an article unless it is already counted"""
+        _, event_id, sentiment_score, event_type, risk_score = entry
+        if event_id in self._ids:
+            return
+        
+        heapq.heappush(self._heap, entry)
+        self._ids.add(event_id)
+        self._apply(sentiment_score, event_type, risk_score, 1)
+    
+    def expire(self, cutoff: datetime):
+        """Drop articles published before the cutoff"""
+        while self._heap and self._heap[0][0] < cutoff:
+            _, event_id, sentiment_score, event_type, risk_score = heapq.heappop(self._heap)
+            self._ids.discard(event_id)
+            self._apply(sentiment_score, event_type, risk_score, -1)
+    
+    def _apply(self, sentiment_score: float, event_type: Optional[str], risk_score: float, sign: int):
+        """Add (sign 1) or remove (sign -1) an article's contribution to the running sums"""
+        self.sentiment_sum += sign * sentiment_score
+        self.risk_penalty += sign * _risk_points(event_type, risk_score)
+        if sentiment_score < NEGATIVE_SENTIMENT:
+            self.negative_count += sign
+        if event_type in HIGH_RISK_EVENTS:
+            self.high_risk_events[event_type] += sign
+            if not self.high_risk_events[event_type]:
+                del self.high_risk_events[event_type]
+    
+    def stats(self) -> NewsWindowStats:
+        """Snapshot of the running sums"""
+        if not self._heap:
+            # Reset float drift once the window empties
+            self.sentiment_sum = 0.0
+            return NewsWindowStats()
+        
+        return NewsWindowStats(
+            article_count=len(self._heap),
+            sentiment_sum=self.sentiment_sum,
+            risk_penalty=self.risk_penalty,
+            negative_count=self.negative_count,
+            high_risk_events=dict(self.high_risk_events)
+        )
+
+
+class NewsWindowAggregator:
+    """Process-wide rolling news aggregates per company, fed by ingestion and loaded on first use"""
+    
+    def __init__(self, window_days: int, resync_seconds: float):
+        self.window = timedelta(days=window_days)
+        self.resync_seconds = resync_seconds
+        self._windows: Dict[int, CompanyNewsWindow] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+    
+    def add(self, rows: Iterable[Any]):
+        """Count newly stored articles in the windows of companies already loaded"""
+        with self._lock:
+            for row in rows:
+                window = self._windows.get(row.company_id)
+                if window is not None and row.published_at is not None:
+                    window.add(self._entry(row))
+    
+    def get(self, db: Session, company_id: int, now: Optional[datetime] = None) -> NewsWindowStats:
+        """Get the window aggregates for one company"""
+        return self.get_many(db, [company_id], now)[company_id]
+    
+    def get_many(self, db: Session, company_ids: Iterable[int],
+                 now: Optional[datetime] = None) -> Dict[int, NewsWindowStats]:
+        """Get window aggregates for companies, loading the ones not held yet in one pass"""
+        now = now or datetime.now()
+        cutoff = now - self.window
+        company_ids = list(dict.fromkeys(int(company_id) for company_id in company_ids))
+        stale_before = time.monotonic() - self.resync_seconds
+        
+        with self._lock:
+            missing = [
+                company_id for company_id in company_ids
+                if company_id not in self._windows or self._windows[company_id].loaded_at < stale_before
+            ]
+            self.hits += len(company_ids) - len(missing)
+        
+        loaded = self._load(db, missing, cutoff) if missing else {}
+        
+        with self._lock:
+            result = {}
+            for company_id in company_ids:
+                window = self._windows.get(company_id) or loaded[company_id]
+                window.expire(cutoff)
+                result[company_id] = window.stats()
+            return result
+    
+    def invalidate(self, company_ids: Optional[Iterable[int]] = None):
+        """Drop held windows so they are reloaded, e.g. after articles are written by another process"""
+        with self._lock:
+            if company_ids is None:
+                self._windows.clear()
+            else:
+                for company_id in company_ids:
+                    self._windows.pop(company_id, None)
+    
+    def _load(self, db: Session, company_ids: List[int], cutoff: datetime) -> Dict[int, CompanyNewsWindow]:
+        """Rebuild windows from the articles stored in the window"""
+        windows = {company_id: CompanyNewsWindow(time.monotonic()) for company_id in company_ids}
+        
+        for start in range(0, len(company_ids), LOAD_CHUNK_SIZE):
+            rows = db.execute(
+                select(
+                    NewsEvent.id,
+                    NewsEvent.company_id,
+                    NewsEvent.published_at,
+                    NewsEvent.sentiment_score,
+                    NewsEvent.event_type,
+                    NewsEvent.risk_score
+                ).where(
+                    NewsEvent.company_id.in_(company_ids[start:start + LOAD_CHUNK_SIZE]),
+                    NewsEvent.published_at >= cutoff
+                )
+            )
+            for row in rows:
+                windows[row.company_id].add(self._entry(row))
+        
+        with self._lock:
+            self._windows.update(windows)
+            self.loads += len(company_ids)
+        
+        return windows
+    
+    def _entry(self, row: Any) -> WindowEntry:
+        """Window entry for a stored news event row"""
+        return (
+            row.published_at,
+            row.id,
+            float(row.sentiment_score or 0.0),
+            row.event_type,
+            float(row.risk_score or 0.0)
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/load counters and the number of held windows"""
+        with self._lock:
+            lookups = self.hits + self.loads
+            return {
+                'hits': self.hits,
+                'loads': self.loads,
+                'hit_ratio': self.hits / lookups if lookups > 0 else 0.0,
+                'companies': len(self._windows),
+                'articles': sum(len(window._heap) for window in self._windows.values()),
+                'window_days': self.window.days,
+                'resync_seconds': self.resync_seconds
+            }
+
+
+# Process-wide aggregates shared by the scoring services
+news_window = NewsWindowAggregator(window_days=NEWS_WINDOW_DAYS, resync_seconds=settings.news_window_resync_seconds)
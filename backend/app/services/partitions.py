@@ -0,0 +1,193 @@
+import re
+import threading
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Set
+import logging
+from datetime import date, datetime
+
+from app.core.config import settings
+from app.core.database import SessionLocal, TIME_PARTITIONING
+
+logger = logging.getLogger(__name__)
+
+# Partitioned tables and their partition key, one range partition per calendar month
+PARTITIONED_TABLES = {
+    'news_events': 'published_at',
+    'credit_scores': 'calculated_at'
+}
+
+
+class Partition(NamedTuple):
+    """One monthly partition, holding rows in [lower, upper)"""
+    name: str
+    lower: date
+    upper: date
+
+
+def _month_start(value: date) -> date:
+    """First day of the month containing a date or datetime"""
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month: date, count: int) -> date:
+    """First day of the month `count` months after `month`"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class PartitionManager:
+    """Creates and drops the monthly partitions of the time-series tables on PostgreSQL"""
+    
+    def __init__(self, tables: Dict[str, str]):
+        self.tables = tables
+        self._months: Dict[str, Set[date]] = {table: set() for table in tables}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.dropped = 0
+    
+    def partition_name(self, table: str, month: date) -> str:
+        """Name of a table's partition for a month"""
+        return f"{table}_p{month:%Y_%m}"
+    
+    def verify(self, db: Session):
+        """Fail fast when partitioning is enabled but a table was created before it was"""
+        if not TIME_PARTITIONING:
+            return
+        
+        partitioned = set(db.scalars(text(
+            "SELECT c.relname FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid"
+        )))
+        for table in self.tables:
+            if table not in partitioned:
+                raise RuntimeError(
+                    f"TIME_PARTITIONING is enabled but {table} is not a partitioned table; "
+                    f"migrate it or disable TIME_PARTITIONING"
+                )
+    
+    def ensure(self, db: Session, table: str, timestamps: Iterable[Optional[datetime]]):
+        """Create any missing partitions for the months of the given timestamps in the caller's transaction"""
+        if not TIME_PARTITIONING:
+            return
+        
+        months = {_month_start(timestamp) for timestamp in timestamps if timestamp is not None}
+        with self._lock:
+            missing = months - self._months[table]
+        if not missing:
+            return
+        
+        # Partitions another process created since the cache was filled
+        missing -= self._load(db, table)
+        
+        # Created in the caller's transaction: a separate connection would wait on the
+        # caller's own lock on the parent table. They are cached once seen committed.
+        column = self.tables[table]
+        for month in sorted(missing):
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.partition_name(table, month)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            ))
+            self.created += 1
+            logger.info(f"Created partition {self.partition_name(table, month)} for {table}.{column}")
+    
+    def ensure_ahead(self, db: Session, months_ahead: Optional[int] = None):
+        """Create this month's partitions and the following months' ahead of time, and commit"""
+        if not TIME_PARTITIONING:
+            return
+        
+        months_ahead = settings.partition_months_ahead if months_ahead is None else months_ahead
+        current = _month_start(datetime.now())
+        months = [_add_months(current, offset) for offset in range(months_ahead + 1)]
+        for table in self.tables:
+            self.ensure(db, table, months)
+        db.commit()
+    
+    def list_partitions(self, db: Session, table: str) -> List[Partition]:
+        """Monthly partitions of a table, oldest first"""
+        return [
+            Partition(self.partition_name(table, month), month, _add_months(month, 1))
+            for month in sorted(self._load(db, table))
+        ]
+    
+    def drop_before(self, db: Session, table: str, cutoff: datetime, keep_referenced: Optional[str] = None,
+                    before_drop: Optional[Callable[[Partition], None]] = None) -> Dict[str, Any]:
+        """Drop the partitions holding only rows older than the cutoff, one transaction each"""
+        dropped = []
+        rows_dropped = 0
+        
+        for partition in self.list_partitions(db, table):
+            if partition.upper > cutoff.date():
+                break
+            
+            # Rows of this partition still referenced elsewhere are left to row-level retention
+            if keep_referenced and db.scalar(text(
+                f"SELECT 1 FROM {partition.name} WHERE id IN ({keep_referenced}) LIMIT 1"
+            )):
+                logger.info(f"Keeping partition {partition.name}: it holds referenced rows")
+                continue
+            
+            if before_drop:
+                before_drop(partition)
+            
+            # Planner row estimate; counting exactly would scan the partition being dropped
+            rows_dropped += max(0, int(db.scalar(text(
+                "SELECT reltuples FROM pg_class WHERE relname = :name"
+            ), {'name': partition.name}) or 0))
+            
+            db.execute(text(f"DROP TABLE {partition.name}"))
+            db.commit()
+            
+            with self._lock:
+                self._months[table].discard(partition.lower)
+                self.dropped += 1
+            dropped.append(partition.name)
+            logger.info(f"Dropped partition {partition.name}")
+        
+        return {'partitions_dropped': dropped, 'rows_dropped': rows_dropped}
+    
+    def _load(self, db: Session, table: str) -> Set[date]:
+        """Months with a partition of the table in the catalog, cached for later inserts"""
+        names = db.scalars(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ), {'table': table})
+        
+        pattern = re.compile(rf"^{table}_p(\d{{4}})_(\d{{2}})$")
+        months = set()
+        for name in names:
+            match = pattern.match(name)
+            if match:
+                months.add(date(int(match.group(1)), int(match.group(2)), 1))
+        
+        with self._lock:
+            self._months[table] = months
+        return months
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get partition counts known to this process"""
+        with self._lock:
+            return {
+                'enabled': TIME_PARTITIONING,
+                'partitions': {table: len(months) for table, months in self._months.items()},
+                'created': self.created,
+                'dropped': self.dropped
+            }
+
+
+# Process-wide partition manager shared by ingestion, scoring and retention
+partitions = PartitionManager(PARTITIONED_TABLES)
+
+
+def ensure_partitions_ahead():
+    """Check the partitioned tables and create upcoming monthly partitions in a dedicated session"""
+    if not TIME_PARTITIONING:
+        return
+    
+    db = SessionLocal()
+    try:
+        partitions.verify(db)
+        partitions.ensure_ahead(db)
+    finally:
+        db.close()
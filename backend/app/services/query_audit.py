@@ -0,0 +1,157 @@
+import re
+import sys
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.company import Company
+from app.services.alert_service import AlertService
+from app.services.company_service import CompanyService
+from app.services.financial_service import FinancialService
+from app.services.news_service import NewsService
+from app.services.scoring_service import ScoringService
+
+logger = logging.getLogger(__name__)
+
+PG_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class QueryAuditService:
+    """Runs the service read paths under EXPLAIN and flags sequential scans"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = engine.dialect.name
+        self.tables = set(Base.metadata.tables)
+    
+    def audit(self, ticker: Optional[str] = None) -> Dict[str, Any]:
+        """Capture the queries issued for a sample ticker and explain each of them"""
+        if ticker is None:
+            company = self.db.query(Company).filter(Company.is_active == True).order_by(Company.id).first()
+            if not company:
+                return {'dialect': self.dialect, 'ticker': None, 'queries': [], 'flagged': 0}
+            ticker = company.ticker
+        
+        queries = []
+        for source, statement, parameters in self._capture_queries(ticker):
+            plan = self._explain(statement, parameters)
+            queries.append({
+                'source': source,
+                'statement': statement,
+                'plan': plan,
+                'sequential_scans': self._sequential_scans(plan)
+            })
+        
+        return {
+            'dialect': self.dialect,
+            'ticker': ticker,
+            'queries': queries,
+            'flagged': sum(1 for query in queries if query['sequential_scans'])
+        }
+    
+    def _read_paths(self, ticker: str) -> List[Tuple[str, Any]]:
+        """Per-ticker and dashboard reads served by the API"""
+        scoring = ScoringService(self.db)
+        news = NewsService(self.db)
+        financial = FinancialService(self.db)
+        alerts = AlertService(self.db)
+        companies = CompanyService(self.db)
+        
+        return [
+            ('ScoringService.get_latest_credit_score', lambda: scoring.get_latest_credit_score(ticker)),
+            ('ScoringService.get_credit_score_history', lambda: scoring.get_credit_score_history(ticker)),
+            ('ScoringService.get_score_trends', lambda: scoring.get_score_trends(ticker)),
+            ('ScoringService.get_leaderboard', lambda: scoring.get_leaderboard()),
+            ('NewsService.get_news_data', lambda: news.get_news_data(ticker)),
+            ('NewsService.get_sentiment_summary', lambda: news.get_sentiment_summary(ticker)),
+            ('NewsService.get_news_events', lambda: news.get_news_events(ticker)),
+            ('NewsService.get_trending_news', lambda: news.get_trending_news()),
+            ('FinancialService.get_financial_data', lambda: financial.get_financial_data(ticker)),
+            ('FinancialService.get_latest_financial_data', lambda: financial.get_latest_financial_data(ticker)),
+            ('AlertService.get_alerts', lambda: alerts.get_alerts()),
+            ('AlertService.get_company_alerts', lambda: alerts.get_company_alerts(ticker)),
+            ('AlertService.get_alerts_summary', lambda: alerts.get_alerts_summary()),
+            ('CompanyService.get_company_summary', lambda: companies.get_company_summary(ticker))
+        ]
+    
+    def _capture_queries(self, ticker: str) -> List[Tuple[str, str, Any]]:
+        """Run each read path and record the distinct SELECT statements it issues"""
+        captured = []
+        seen = set()
+        current = {'source': None}
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT') and (current['source'], statement) not in seen:
+                seen.add((current['source'], statement))
+                captured.append((current['source'], statement, parameters))
+        
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            for source, read in self._read_paths(ticker):
+                current['source'] = source
+                try:
+                    read()
+                except Exception as e:
+                    logger.warning(f"Query audit could not run {source}: {e}")
+                    self.db.rollback()
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        
+        return captured
+    
+    def _explain(self, statement: str, parameters: Any) -> List[str]:
+        """Get the query plan lines for a statement"""
+        prefix = 'EXPLAIN QUERY PLAN ' if self.dialect == 'sqlite' else 'EXPLAIN '
+        
+        try:
+            with engine.connect() as connection:
+                rows = connection.exec_driver_sql(prefix + statement, parameters).all()
+            return [str(row[-1]) for row in rows]
+        except Exception as e:
+            logger.warning(f"Could not explain query: {e}")
+            return []
+    
+    def _sequential_scans(self, plan: List[str]) -> List[str]:
+        """Tables read by full sequential scan in a plan"""
+        if self.dialect == 'sqlite':
+            # "SCAN table" is a full scan; "SCAN table USING INDEX" walks an index instead
+            scanned = [
+                line.split()[1] for line in plan
+                if line.startswith('SCAN ') and 'USING' not in line
+            ]
+        else:
+            scanned = [match for line in plan for match in PG_SEQ_SCAN.findall(line)]
+        
+        return sorted({table for table in scanned if table in self.tables})
+
+
+def run_query_audit(ticker: Optional[str] = None) -> Dict[str, Any]:
+    """Run the query plan audit in a dedicated session and log flagged queries"""
+    db = SessionLocal()
+    try:
+        report = QueryAuditService(db).audit(ticker)
+    finally:
+        db.close()
+    
+    for query in report['queries']:
+        if query['sequential_scans']:
+            logger.warning(f"Sequential scan on {', '.join(query['sequential_scans'])} in {query['source']}")
+    
+    logger.info(
+        f"Query audit explained {len(report['queries'])} queries for {report['ticker']}, "
+        f"{report['flagged']} with sequential scans"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    
+    audit_report = run_query_audit(sys.argv[1] if len(sys.argv) > 1 else None)
+    for audited in audit_report['queries']:
+        flag = "SEQ SCAN" if audited['sequential_scans'] else "ok"
+        print(f"[{flag}] {audited['source']}")
+        for line in audited['plan']:
+            print(f"    {line}")
@@ -0,0 +1,177 @@
+import asyncio
+from typing import Dict, Any, List, Optional
+import logging
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.core.bloom import BloomFilter
+from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.executors import run_blocking
+from app.services.financial_service import FinancialService
+from app.services.news_service import NewsService
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshEngine:
+    """Bounded-concurrency engine for refreshing financial and news data"""
+    
+    PROVIDERS = ('financial', 'news')
+    
+    def __init__(self, financial_concurrency: Optional[int] = None,
+                 news_concurrency: Optional[int] = None,
+                 ticker_timeout: Optional[float] = None,
+                 chunk_size: Optional[int] = None):
+        self.concurrency = {
+            'financial': financial_concurrency or settings.financial_fetch_concurrency,
+            'news': news_concurrency or settings.news_fetch_concurrency
+        }
+        self.ticker_timeout = ticker_timeout or settings.ticker_fetch_timeout
+        self.chunk_size = chunk_size or settings.bulk_download_chunk_size
+        self.chunk_timeout = settings.bulk_fetch_timeout
+    
+    async def refresh(self, tickers: List[str]) -> Dict[str, Any]:
+        """Refresh financial and news data for the given tickers concurrently"""
+        started_at = datetime.now()
+        start = time.perf_counter()
+        
+        semaphores = {
+            provider: asyncio.Semaphore(limit)
+            for provider, limit in self.concurrency.items()
+        }
+        
+        # One seen-article filter per run so known articles skip analysis and writes
+        seen_urls = await run_blocking(self._build_seen_filter)
+        
+        # Financial data is downloaded in batched chunks, news per ticker
+        chunks = [tickers[i:i + self.chunk_size] for i in range(0, len(tickers), self.chunk_size)]
+        batches = await asyncio.gather(
+            *[self._run_financial_chunk(index, chunk, semaphores['financial']) for index, chunk in enumerate(chunks)],
+            *[self._run_news(ticker, semaphores['news'], seen_urls) for ticker in tickers]
+        )
+        results = [result for batch in batches for result in batch]
+        
+        summary = self._summarize(results)
+        summary.update({
+            'companies_count': len(tickers),
+            'started_at': started_at.isoformat(),
+            'duration_seconds': time.perf_counter() - start
+        })
+        
+        logger.info(
+            f"Refreshed {len(tickers)} companies in {summary['duration_seconds']:.1f}s: "
+            f"{summary['successes']} succeeded, {summary['failures']} failed, "
+            f"p50={summary['p50_latency']:.2f}s, p95={summary['p95_latency']:.2f}s"
+        )
+        return summary
+    
+    async def _run_financial_chunk(self, index: int, tickers: List[str],
+                                   semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        """Run a bulk financial fetch for a chunk of tickers under the provider limit and timeout"""
+        async with semaphore:
+            start = time.perf_counter()
+            
+            try:
+                outcomes = await asyncio.wait_for(self._fetch_financial(tickers), timeout=self.chunk_timeout)
+                errors = {
+                    ticker: outcomes.get(ticker.upper(), {}).get('error', 'no result')
+                    for ticker in tickers
+                    if outcomes.get(ticker.upper(), {}).get('status') != 'success'
+                }
+            except asyncio.TimeoutError:
+                errors = {ticker: f"timed out after {self.chunk_timeout}s" for ticker in tickers}
+            except Exception as e:
+                errors = {ticker: str(e) for ticker in tickers}
+            
+            latency = time.perf_counter() - start
+            return [
+                self._result('financial', ticker, errors.get(ticker), latency, fetch=f"chunk-{index}")
+                for ticker in tickers
+            ]
+    
+    async def _run_news(self, ticker: str, semaphore: asyncio.Semaphore,
+                        seen_urls: BloomFilter) -> List[Dict[str, Any]]:
+        """Run a single news fetch under the provider limit and per-ticker timeout"""
+        async with semaphore:
+            start = time.perf_counter()
+            error = None
+            
+            try:
+                await asyncio.wait_for(self._fetch_news(ticker, seen_urls), timeout=self.ticker_timeout)
+            except asyncio.TimeoutError:
+                error = f"timed out after {self.ticker_timeout}s"
+            except Exception as e:
+                error = str(e)
+            
+            return [self._result('news', ticker, error, time.perf_counter() - start)]
+    
+    async def _fetch_financial(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch financial data for a chunk of tickers in a dedicated database session"""
+        db = SessionLocal()
+        try:
+            return await FinancialService(db).fetch_financial_data_bulk(tickers)
+        finally:
+            db.close()
+    
+    async def _fetch_news(self, ticker: str, seen_urls: BloomFilter) -> Dict[str, Any]:
+        """Fetch news for a ticker in a dedicated database session"""
+        db = SessionLocal()
+        try:
+            return await NewsService(db).fetch_news_data(ticker, seen_urls)
+        finally:
+            db.close()
+    
+    def _build_seen_filter(self) -> BloomFilter:
+        """Build the run's filter of recently stored articles"""
+        db = SessionLocal()
+        try:
+            return NewsService(db).build_seen_filter()
+        finally:
+            db.close()
+    
+    def _result(self, provider: str, ticker: str, error: Optional[str], latency: float,
+                fetch: Optional[str] = None) -> Dict[str, Any]:
+        """Build a per-ticker fetch result; tickers fetched together share one fetch and its latency"""
+        if error:
+            logger.error(f"Error refreshing {provider} data for {ticker}: {error}")
+        
+        return {
+            'provider': provider,
+            'ticker': ticker,
+            'success': error is None,
+            'error': error,
+            'fetch': fetch or ticker,
+            'latency': latency
+        }
+    
+    def _summarize(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build per-run and per-provider success/latency statistics"""
+        summary = self._stats(results)
+        summary['providers'] = {
+            provider: self._stats([r for r in results if r['provider'] == provider])
+            for provider in self.PROVIDERS
+        }
+        summary['failed'] = [
+            {'provider': r['provider'], 'ticker': r['ticker'], 'error': r['error']}
+            for r in results if not r['success']
+        ]
+        return summary
+    
+    def _stats(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calculate success counts per ticker and latency percentiles per fetch"""
+        # A financial chunk is one fetch; counting its latency once per ticker would skew the percentiles
+        fetches = {(r['provider'], r['fetch']): r['latency'] for r in results}
+        latencies = list(fetches.values())
+        successes = sum(1 for r in results if r['success'])
+        
+        return {
+            'successes': successes,
+            'failures': len(results) - successes,
+            'fetches': len(fetches),
+            'p50_latency': float(np.percentile(latencies, 50)) if latencies else 0.0,
+            'p95_latency': float(np.percentile(latencies, 95)) if latencies else 0.0
+        }
+
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from typing import Dict, Any, Iterable, NamedTuple, Optional, Tuple
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (endpoint, company_id, data version, sorted query params)
+CacheKey = Tuple[str, int, int, Tuple[Tuple[str, Any], ...]]
+
+
+class CachedResponse(NamedTuple):
+    """Serialized JSON body with its entity tag and expiry"""
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class ResponseCache:
+    """Per-process cache of serialized read responses, invalidated by per-company data versions"""
+    
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+    
+    def key(self, endpoint: str, company_id: int, **params) -> CacheKey:
+        """Build a cache key bound to the company's current data version; take it before reading"""
+        with self._lock:
+            version = self._versions.get(company_id, 0)
+        return (endpoint, company_id, version, tuple(sorted(params.items())))
+    
+    def invalidate(self, company_ids: Iterable[int]):
+        """Bump the data version of companies whose scores, financials or news changed"""
+        with self._lock:
+            for company_id in set(company_ids):
+                self._versions[company_id] = self._versions.get(company_id, 0) + 1
+    
+    def cached(self, request: Request, key: CacheKey) -> Optional[Response]:
+        """Serve a cached response (304 when the client's ETag matches), or None on a miss"""
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+        
+        return self._respond(request, entry)
+    
+    def store(self, request: Request, key: CacheKey, payload: Any) -> Response:
+        """Serialize a payload, cache it under the key and respond with it"""
+        body = json.dumps(jsonable_encoder(payload), separators=(',', ':')).encode('utf-8')
+        entry = CachedResponse(
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            expires_at=time.monotonic() + self.ttl
+        )
+        
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        
+        return self._respond(request, entry)
+    
+    def _respond(self, request: Request, entry: CachedResponse) -> Response:
+        """Build a 200 or 304 response for an entry"""
+        headers = {'ETag': entry.etag, 'Cache-Control': 'no-cache'}
+        
+        if_none_match = request.headers.get('if-none-match', '')
+        if entry.etag in [tag.strip() for tag in if_none_match.split(',')]:
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=entry.body, media_type='application/json', headers=headers)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and hit ratio"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_ratio': self.hits / lookups if lookups > 0 else 0.0,
+                'entries': len(self._entries),
+                'capacity': self.capacity,
+                'ttl_seconds': self.ttl
+            }
+
+
+# Process-wide cache shared by all request handlers
+response_cache = ResponseCache(capacity=settings.response_cache_size, ttl=settings.response_cache_ttl)
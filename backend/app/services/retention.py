@@ -0,0 +1,226 @@
+import json
+import time
+from sqlalchemy import delete, or_, select, text
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, NamedTuple, Optional
+import logging
+from datetime import datetime, timedelta
+
+from app.models.financial_data import FinancialData
+from app.models.news_event import NewsEvent
+from app.models.credit_score import CreditScore
+from app.models.latest_credit_score import LatestCreditScore
+from app.models.sentiment_cache import SentimentCacheEntry
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, TIME_PARTITIONING
+from app.services.partitions import PARTITIONED_TABLES, Partition, partitions
+from app.services.archive import archive_columns, get_archive_store
+from app.services.text_analyzers import ANALYSIS_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy(NamedTuple):
+    """How long rows of one table are kept, judged by one timestamp column"""
+    model: Any
+    timestamp_column: str
+    retention_days: int
+    archived: bool = True
+    
+    @property
+    def table_name(self) -> str:
+        """Name of the policy's table"""
+        return self.model.__tablename__
+
+
+def retention_policies() -> List[RetentionPolicy]:
+    """Per-table retention policies from settings"""
+    return [
+        RetentionPolicy(FinancialData, 'date', settings.financial_data_retention_days),
+        RetentionPolicy(NewsEvent, 'published_at', settings.news_retention_days),
+        RetentionPolicy(CreditScore, 'calculated_at', settings.credit_score_retention_days),
+        # Derived results; recomputed on a miss, so never archived
+        RetentionPolicy(SentimentCacheEntry, 'created_at', settings.sentiment_cache_retention_days, archived=False)
+    ]
+
+
+class RetentionService:
+    """Purges rows past their retention period in primary-key batches, one short transaction each"""
+    
+    def __init__(self, db: Session, batch_size: Optional[int] = None, batch_pause: Optional[float] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.retention_batch_size
+        self.batch_pause = settings.retention_batch_pause if batch_pause is None else batch_pause
+        self.archive = get_archive_store()
+    
+    def run(self, policies: Optional[List[RetentionPolicy]] = None, vacuum: Optional[bool] = None) -> Dict[str, Any]:
+        """Apply every retention policy, then reclaim space and refresh planner statistics"""
+        policies = retention_policies() if policies is None else policies
+        vacuum = settings.retention_vacuum if vacuum is None else vacuum
+        start = time.perf_counter()
+        
+        tables = {}
+        for policy in policies:
+            if policy.retention_days <= 0:
+                continue
+            tables[policy.table_name] = self.purge(policy)
+        
+        purged = [name for name, stats in tables.items() if stats['rows_deleted']]
+        if vacuum and purged:
+            self.compact(purged)
+        
+        duration = time.perf_counter() - start
+        rows_deleted = sum(stats['rows_deleted'] for stats in tables.values())
+        return {
+            'tables': tables,
+            'rows_deleted': rows_deleted,
+            'duration_seconds': duration,
+            'rows_per_second': rows_deleted / duration if duration else 0.0,
+            'compacted': purged if vacuum else []
+        }
+    
+    def purge(self, policy: RetentionPolicy) -> Dict[str, Any]:
+        """Delete one table's expired rows in primary-key ranges, committing and pausing between batches"""
+        model = policy.model
+        key = model.__mapper__.primary_key[0]
+        timestamp = getattr(model, policy.timestamp_column)
+        cutoff = datetime.now() - timedelta(days=policy.retention_days)
+        archive = self.archive if policy.archived else None
+        
+        expired = [timestamp < cutoff]
+        if model is SentimentCacheEntry:
+            # Results of an older analyzer setup can never be hit again
+            expired = [or_(timestamp < cutoff, SentimentCacheEntry.analysis_version.is_distinct_from(ANALYSIS_VERSION))]
+        elif model is CreditScore:
+            # The latest score of a company is kept even when old; the projection references it
+            expired.append(CreditScore.id.notin_(select(LatestCreditScore.credit_score_id)))
+        
+        start = time.perf_counter()
+        rows_deleted = 0
+        rows_archived = 0
+        batches = 0
+        last_id = None
+        
+        # Whole months past the cutoff go as partition drops; row batches only cover the boundary month
+        dropped = {'partitions_dropped': [], 'rows_dropped': 0}
+        if TIME_PARTITIONING and policy.table_name in PARTITIONED_TABLES:
+            dropped = partitions.drop_before(
+                self.db, policy.table_name, cutoff,
+                keep_referenced="SELECT credit_score_id FROM latest_credit_scores" if model is CreditScore else None,
+                before_drop=(lambda partition: self._archive_partition(policy, partition)) if archive else None
+            )
+        
+        try:
+            while True:
+                # Walk the primary key so each batch starts where the last one ended
+                after_last = [key > last_id] if last_id is not None else []
+                ids = self.db.scalars(
+                    select(key).where(*expired, *after_last).order_by(key).limit(self.batch_size)
+                ).all()
+                if not ids:
+                    break
+                
+                # Copy the batch to the archive before it is deleted
+                if archive:
+                    rows_archived += self._archive_rows(policy, [key.between(ids[0], ids[-1]), *expired])
+                
+                result = self.db.execute(
+                    delete(model).where(
+                        key.between(ids[0], ids[-1]), *expired
+                    ).execution_options(synchronize_session=False)
+                )
+                self.db.commit()
+                
+                rows_deleted += result.rowcount
+                batches += 1
+                last_id = ids[-1]
+                
+                # Give other writers the lock between batches
+                if self.batch_pause and len(ids) == self.batch_size:
+                    time.sleep(self.batch_pause)
+                    
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error purging {policy.table_name} after {rows_deleted} rows: {e}")
+            raise
+        
+        duration = time.perf_counter() - start
+        stats = {
+            'cutoff': cutoff.isoformat(),
+            'rows_deleted': rows_deleted,
+            'batches': batches,
+            'rows_archived': rows_archived,
+            **dropped,
+            'duration_seconds': duration,
+            'rows_per_second': (rows_deleted + dropped['rows_dropped']) / duration if duration else 0.0
+        }
+        logger.info(
+            f"Retention purged {rows_deleted} rows from {policy.table_name} older than "
+            f"{policy.retention_days} days in {batches} batches and dropped "
+            f"{len(dropped['partitions_dropped'])} partitions ({stats['rows_per_second']:,.0f} rows/s)"
+        )
+        return stats
+    
+    def _archive_rows(self, policy: RetentionPolicy, conditions: List[Any]) -> int:
+        """Write the rows matching the conditions to the archive"""
+        rows = self.db.execute(
+            select(*archive_columns(policy.model)).where(*conditions)
+        ).mappings().all()
+        return self.archive.write(policy.model, policy.timestamp_column, rows)
+    
+    def _archive_partition(self, policy: RetentionPolicy, partition: Partition):
+        """Stream a whole partition into the archive in primary-key batches before it is dropped"""
+        model = policy.model
+        timestamp = getattr(model, policy.timestamp_column)
+        in_partition = [
+            timestamp >= datetime.combine(partition.lower, datetime.min.time()),
+            timestamp < datetime.combine(partition.upper, datetime.min.time())
+        ]
+        
+        archived = 0
+        last_id = 0
+        while True:
+            ids = self.db.scalars(
+                select(model.id).where(*in_partition, model.id > last_id).order_by(model.id).limit(self.batch_size)
+            ).all()
+            if not ids:
+                break
+            
+            archived += self._archive_rows(policy, [model.id.between(ids[0], ids[-1]), *in_partition])
+            last_id = ids[-1]
+        
+        logger.info(f"Archived {archived} rows of partition {partition.name}")
+    
+    def compact(self, table_names: List[str]):
+        """Return freed pages to the database and refresh planner statistics after a purge"""
+        try:
+            # VACUUM cannot run inside a transaction block
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                if engine.dialect.name == "postgresql":
+                    for table_name in table_names:
+                        connection.execute(text(f"VACUUM (ANALYZE) {table_name}"))
+                else:
+                    # Only reclaims space when the database was created with auto_vacuum=INCREMENTAL;
+                    # a full VACUUM rewrites the whole file and is left to operators
+                    connection.execute(text("PRAGMA incremental_vacuum"))
+                    for table_name in table_names:
+                        connection.execute(text(f"ANALYZE {table_name}"))
+            
+            logger.info(f"Compacted {', '.join(table_names)} after retention purge")
+            
+        except Exception as e:
+            logger.error(f"Error compacting tables after retention purge: {e}")
+
+
+def run_retention() -> Dict[str, Any]:
+    """Run the retention policies in a dedicated session"""
+    db = SessionLocal()
+    try:
+        return RetentionService(db).run()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    print(json.dumps(run_retention(), indent=2))
@@ -2,18 +2,19 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.orm import Session
 import logging
-from datetime import datetime, timedelta
 from typing import List
 
 from app.core.database import SessionLocal
 from app.services.data_service import DataService
 from app.services.scoring_service import ScoringService
+from app.services.batch_scoring_service import run_dirty_scoring
 from app.services.alert_service import AlertService
+from app.services.refresh_engine import RefreshEngine
+from app.services.retention import run_retention
+from app.services.partitions import ensure_partitions_ahead
 from app.models.company import Company
 from app.core.config import settings
-from app.models.financial_data import FinancialData
-from app.models.news_event import NewsEvent
-from app.models.credit_score import CreditScore
+from app.core.executors import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -85,34 +86,25 @@ async def refresh_all_data_job():
     
     try:
         db = SessionLocal()
-        data_service = DataService(db)
         
         # Get all active companies
-        companies = db.query(Company).filter(Company.is_active == True).all()
+        tickers = [
+            ticker for (ticker,) in
+            db.query(Company.ticker).filter(Company.is_active == True).all()
+        ]
         
-        if not companies:
+        if not tickers:
             logger.info("No active companies found for data refresh")
             return
         
-        logger.info(f"Refreshing data for {len(companies)} companies")
-        
-        # Refresh data for each company
-        for company in companies:
-            try:
-                # Refresh financial data
-                await data_service.financial_service.fetch_financial_data(company.ticker)
-                
-                # Refresh news data
-                await data_service.news_service.fetch_news_data(company.ticker)
-                
-                logger.info(f"Refreshed data for {company.ticker}")
-                
-            except Exception as e:
-                logger.error(f"Error refreshing data for {company.ticker}: {e}")
-                continue
+        logger.info(f"Refreshing data for {len(tickers)} companies")
         
-        logger.info("Data refresh job completed")
+        # Fan out financial and news fetches across the refresh worker pool
+        summary = await RefreshEngine().refresh(tickers)
         
+        logger.info(f"Data refresh job completed: {summary['successes']} fetches succeeded, "
+                   f"{summary['failures']} failed")
+                   
     except Exception as e:
         logger.error(f"Error in data refresh job: {e}")
     finally:
@@ -124,34 +116,14 @@ async def compute_all_scores_job():
     logger.info("Starting credit score computation job")
     
     try:
-        db = SessionLocal()
-        scoring_service = ScoringService(db)
-        
-        # Get all active companies
-        companies = db.query(Company).filter(Company.is_active == True).all()
-        
-        if not companies:
-            logger.info("No active companies found for score computation")
-            return
-        
-        logger.info(f"Computing scores for {len(companies)} companies")
-        
-        # Compute scores for each company
-        for company in companies:
-            try:
-                await scoring_service._compute_score_background(company.ticker)
-                logger.info(f"Computed score for {company.ticker}")
-                
-            except Exception as e:
-                logger.error(f"Error computing score for {company.ticker}: {e}")
-                continue
-        
-        logger.info("Credit score computation job completed")
+        # Batch scoring is synchronous; run it off the event loop in its own session
+        result = await run_blocking(run_dirty_scoring)
         
+        logger.info(f"Credit score computation job completed: "
+                   f"{result['companies_scored']} companies scored")
+                   
     except Exception as e:
         logger.error(f"Error in credit score computation job: {e}")
-    finally:
-        db.close()
 
 
 async def cleanup_alerts_job():
@@ -178,37 +150,20 @@ async def daily_maintenance_job():
     logger.info("Starting daily maintenance job")
     
     try:
-        db = SessionLocal()
-        
-        # Clean up old data (keep last 90 days)
-        cutoff_date = datetime.now() - timedelta(days=90)
-        
-        # Clean up old financial data
-        old_financial = db.query(FinancialData).filter(
-            FinancialData.date < cutoff_date
-        ).delete()
-        
-        # Clean up old news events
-        old_news = db.query(NewsEvent).filter(
-            NewsEvent.published_at < cutoff_date
-        ).delete()
+        # Keep next months' partitions created before any row needs them
+        await run_blocking(ensure_partitions_ahead)
         
-        # Clean up old credit scores (keep last 30 days)
-        score_cutoff = datetime.now() - timedelta(days=30)
-        old_scores = db.query(CreditScore).filter(
-            CreditScore.calculated_at < score_cutoff
-        ).delete()
-        
-        db.commit()
-        
-        logger.info(f"Daily maintenance completed: {old_financial} financial records, "
-                   f"{old_news} news events, {old_scores} credit scores cleaned")
+        # Batched purge with pauses runs off the event loop in its own session
+        result = await run_blocking(run_retention)
         
+        cleaned = ", ".join(
+            f"{stats['rows_deleted']} {table_name}" for table_name, stats in result['tables'].items()
+        )
+        logger.info(f"Daily maintenance completed: {cleaned or 'retention disabled'} rows cleaned "
+                   f"({result['rows_per_second']:,.0f} rows/s)")
+                   
     except Exception as e:
         logger.error(f"Error in daily maintenance job: {e}")
-        db.rollback()
-    finally:
-        db.close()
 
 
 def add_company_to_scheduler(ticker: str):
@@ -1,20 +1,33 @@
-import pandas as pd
 import numpy as np
+import pandas as pd
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List, Optional
 import logging
 from datetime import datetime, timedelta
-import xgboost as xgb
-import shap
 
 from app.models.company import Company
 from app.models.financial_data import FinancialData
-from app.models.news_event import NewsEvent
 from app.models.credit_score import CreditScore
+from app.models.latest_credit_score import LatestCreditScore
 from app.core.config import settings
+from app.core.database import dialect_insert
+from app.services.company_cache import company_cache
+from app.services.news_window import NewsWindowStats, news_window
+from app.services.response_cache import response_cache
+from app.services.alert_service import AlertService
+from app.services.model_scoring import FINANCIAL_COLUMNS, add_news_features, get_distress_model, get_scorer
+from app.services.partitions import partitions
+from app.services.archive import get_archive_store
 
 logger = logging.getLogger(__name__)
 
+# Credit score columns read for score history, from the database or the archive
+HISTORY_COLUMNS = [
+    'id', 'calculated_at', 'overall_score', 'financial_score', 'market_score',
+    'news_score', 'score_change', 'trend_direction'
+]
+
 
 class ScoringService:
     """Service for credit scoring and explainability"""
@@ -24,15 +37,13 @@ class ScoringService:
         self.financial_weight = settings.financial_weight
         self.market_weight = settings.market_weight
         self.news_weight = settings.news_weight
+        self.alert_service = AlertService(db)
     
     async def compute_credit_score(self, ticker: str, background_tasks) -> Dict[str, Any]:
         """Compute credit score for a company"""
         try:
             # Check if company exists
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 raise ValueError(f"Company with ticker {ticker} not found or inactive")
@@ -51,7 +62,7 @@ class ScoringService:
         try:
             # Get latest data
             financial_data = self._get_latest_financial_data(ticker)
-            news_data = self._get_latest_news_data(ticker)
+            news_data = self._get_news_window(ticker)
             
             if not financial_data:
                 logger.warning(f"No financial data available for {ticker}")
@@ -62,12 +73,24 @@ class ScoringService:
             market_score = self._calculate_market_score(financial_data)
             news_score = self._calculate_news_score(news_data)
             
-            # Calculate overall score
-            overall_score = (
-                self.financial_weight * financial_score +
-                self.market_weight * market_score +
-                self.news_weight * news_score
-            )
+            # Calculate overall score with the scorer
+            features = pd.DataFrame([{
+                'company_id': financial_data.company_id,
+                **{column: getattr(financial_data, column) for column in FINANCIAL_COLUMNS},
+                'financial_score': financial_score,
+                'market_score': market_score,
+                'news_score': news_score
+            }])
+            scorer = get_scorer(self.financial_weight, self.market_weight, self.news_weight)
+            overall_score = float(scorer.score(features)[0])
+            
+            # The distress model is recorded next to the score, not blended into it
+            score_breakdown = None
+            distress_model = get_distress_model()
+            if distress_model:
+                score_breakdown = distress_model.breakdown(distress_model.predict(
+                    add_news_features(features, {financial_data.company_id: news_data})
+                )[0])
             
             # Get previous score for comparison
             previous_score = self._get_previous_score(ticker)
@@ -94,7 +117,7 @@ class ScoringService:
             self._save_credit_score(
                 ticker, overall_score, financial_score, market_score, news_score,
                 score_change, trend_direction, volatility, explanation_data,
-                feature_importance
+                feature_importance, scorer.model_version, scorer.method, score_breakdown
             )
             
             logger.info(f"Successfully computed credit score for {ticker}: {overall_score}")
@@ -105,10 +128,7 @@ class ScoringService:
     def _get_latest_financial_data(self, ticker: str) -> Optional[FinancialData]:
         """Get latest financial data for scoring"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
@@ -121,27 +141,19 @@ class ScoringService:
             logger.error(f"Error getting latest financial data for {ticker}: {e}")
             return None
     
-    def _get_latest_news_data(self, ticker: str) -> List[NewsEvent]:
-        """Get latest news data for scoring"""
+    def _get_news_window(self, ticker: str) -> NewsWindowStats:
+        """Get the rolling 7-day news aggregates for scoring"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
-                return []
+                return NewsWindowStats()
             
-            # Get news from last 7 days
-            cutoff_date = datetime.now() - timedelta(days=7)
-            return self.db.query(NewsEvent).filter(
-                NewsEvent.company_id == company.id,
-                NewsEvent.published_at >= cutoff_date
-            ).order_by(NewsEvent.published_at.desc()).all()
+            return news_window.get(self.db, company.id)
             
         except Exception as e:
-            logger.error(f"Error getting latest news data for {ticker}: {e}")
-            return []
+            logger.error(f"Error getting news window for {ticker}: {e}")
+            return NewsWindowStats()
     
     def _calculate_financial_score(self, financial_data: FinancialData) -> float:
         """Calculate financial health score (0-100)"""
@@ -240,33 +252,20 @@ class ScoringService:
             logger.error(f"Error calculating market score: {e}")
             return 50.0
     
-    def _calculate_news_score(self, news_events: List[NewsEvent]) -> float:
+    def _calculate_news_score(self, news: NewsWindowStats) -> float:
         """Calculate news sentiment score (0-100)"""
         try:
-            if not news_events:
+            if not news.article_count:
                 return 50.0  # Neutral if no news
             
             score = 50.0  # Base score
             
-            # Calculate average sentiment
-            sentiment_scores = [event.sentiment_score for event in news_events]
-            avg_sentiment = sum(sentiment_scores) / len(sentiment_scores)
-            
-            # Convert sentiment to score (VADER range: -1 to 1)
-            sentiment_contribution = avg_sentiment * 30  # Max ±30 points
+            # Convert average sentiment to score (VADER range: -1 to 1)
+            sentiment_contribution = news.avg_sentiment * 30  # Max ±30 points
             score += sentiment_contribution
             
-            # Consider high-risk events
-            high_risk_events = ['default', 'legal', 'restructuring']
-            risk_penalty = 0
-            
-            for event in news_events:
-                if event.event_type in high_risk_events:
-                    risk_penalty += 10
-                elif event.risk_score > 0.7:
-                    risk_penalty += 5
-            
-            score -= min(risk_penalty, 20)  # Max 20 point penalty
+            # High-risk events cost 10 points, other risky articles 5
+            score -= min(news.risk_penalty, 20)  # Max 20 point penalty
             
             return max(0, min(100, score))
             
@@ -277,10 +276,7 @@ class ScoringService:
     def _get_previous_score(self, ticker: str) -> Optional[float]:
         """Get previous credit score for comparison"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
@@ -307,10 +303,7 @@ class ScoringService:
     def _calculate_volatility(self, ticker: str) -> float:
         """Calculate score volatility over time"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return 0.0
@@ -333,7 +326,7 @@ class ScoringService:
     
     def _generate_explanation(self, ticker: str, overall_score: float, financial_score: float,
                             market_score: float, news_score: float, financial_data: FinancialData,
-                            news_events: List[NewsEvent], score_change: float) -> Dict[str, Any]:
+                            news: NewsWindowStats, score_change: float) -> Dict[str, Any]:
         """Generate explanation for credit score"""
         try:
             key_factors = []
@@ -358,15 +351,13 @@ class ScoringService:
                 risk_indicators.append("market_volatility")
             
             # News factors
-            if news_events:
-                negative_news = [event for event in news_events if event.sentiment_score < -0.3]
-                if negative_news:
-                    key_factors.append(f"Negative sentiment in {len(negative_news)} recent news articles")
+            if news.article_count:
+                if news.negative_count:
+                    key_factors.append(f"Negative sentiment in {news.negative_count} recent news articles")
                     risk_indicators.append("negative_news_sentiment")
                 
-                high_risk_events = [event for event in news_events if event.event_type in ['default', 'legal', 'restructuring']]
-                if high_risk_events:
-                    key_factors.append(f"High-risk events detected: {', '.join(set([event.event_type for event in high_risk_events]))}")
+                if news.high_risk_events:
+                    key_factors.append(f"High-risk events detected: {', '.join(news.high_risk_events)}")
                     risk_indicators.append("high_risk_events")
             
             # Generate summary
@@ -391,7 +382,7 @@ class ScoringService:
                 'risk_indicators': []
             }
     
-    def _calculate_feature_importance(self, financial_data: FinancialData, news_events: List[NewsEvent]) -> Dict[str, float]:
+    def _calculate_feature_importance(self, financial_data: FinancialData, news: NewsWindowStats) -> Dict[str, float]:
         """Calculate feature importance using SHAP-like approach"""
         try:
             importance = {}
@@ -410,12 +401,9 @@ class ScoringService:
                 importance['price_volatility'] = financial_data.price_volatility * 50
             
             # News features
-            if news_events:
-                avg_sentiment = sum([event.sentiment_score for event in news_events]) / len(news_events)
-                importance['news_sentiment'] = abs(avg_sentiment) * 30
-                
-                high_risk_count = len([event for event in news_events if event.event_type in ['default', 'legal', 'restructuring']])
-                importance['high_risk_events'] = high_risk_count * 15
+            if news.article_count:
+                importance['news_sentiment'] = abs(news.avg_sentiment) * 30
+                importance['high_risk_events'] = news.high_risk_count * 15
             
             return importance
             
@@ -426,17 +414,21 @@ class ScoringService:
     def _save_credit_score(self, ticker: str, overall_score: float, financial_score: float,
                           market_score: float, news_score: float, score_change: float,
                           trend_direction: str, volatility: float, explanation_data: Dict,
-                          feature_importance: Dict):
+                          feature_importance: Dict, model_version: str = "1.0",
+                          calculation_method: str = "weighted_average",
+                          score_breakdown: Optional[Dict] = None):
         """Save credit score to database"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 raise ValueError(f"Company {ticker} not found")
             
+            # Last stored score, which alerts compare the new score against
+            last_score = self.db.query(LatestCreditScore.overall_score).filter(
+                LatestCreditScore.company_id == company.id
+            ).scalar()
+            
             credit_score = CreditScore(
                 company_id=company.id,
                 overall_score=overall_score,
@@ -450,41 +442,121 @@ class ScoringService:
                 key_factors=explanation_data['key_factors'],
                 risk_indicators=explanation_data['risk_indicators'],
                 feature_importance=feature_importance,
-                model_version="1.0",
-                calculation_method="weighted_average",
+                score_breakdown=score_breakdown,
+                model_version=model_version,
+                calculation_method=calculation_method,
                 confidence_level=0.85,
                 calculated_at=datetime.now(),
                 valid_until=datetime.now() + timedelta(hours=24)
             )
             
+            partitions.ensure(self.db, 'credit_scores', [credit_score.calculated_at])
             self.db.add(credit_score)
+            self.db.flush()
+            
+            # Keep the latest-score projection in the same transaction
+            self._upsert_latest_scores([{
+                'company_id': company.id,
+                'credit_score_id': credit_score.id,
+                'overall_score': overall_score,
+                'score_change': score_change,
+                'trend_direction': trend_direction,
+                'calculated_at': credit_score.calculated_at
+            }])
+            
+            # Alerts on the move since the last score, committed with the score as in batch scoring
+            self.alert_service.insert_alerts(self.alert_service.evaluate_score_changes(
+                [company.id], [last_score], [overall_score]
+            ))
             self.db.commit()
+            response_cache.invalidate([company.id])
             
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error saving credit score: {e}")
             raise
     
+    def _upsert_latest_scores(self, rows: List[Dict[str, Any]]):
+        """Point the latest-score projection at newly saved scores, ignoring out-of-order writes"""
+        if not rows:
+            return
+        
+        statement = dialect_insert(LatestCreditScore)
+        statement = statement.on_conflict_do_update(
+            index_elements=['company_id'],
+            set_={
+                'credit_score_id': statement.excluded.credit_score_id,
+                'overall_score': statement.excluded.overall_score,
+                'score_change': statement.excluded.score_change,
+                'trend_direction': statement.excluded.trend_direction,
+                'calculated_at': statement.excluded.calculated_at
+            },
+            where=LatestCreditScore.calculated_at <= statement.excluded.calculated_at
+        )
+        self.db.execute(statement, rows)
+    
+    def rebuild_latest_scores(self) -> int:
+        """Repopulate the latest-score projection from the credit score history"""
+        try:
+            ranked = select(
+                CreditScore.company_id,
+                CreditScore.id.label('credit_score_id'),
+                CreditScore.overall_score,
+                CreditScore.score_change,
+                CreditScore.trend_direction,
+                CreditScore.calculated_at,
+                func.row_number().over(
+                    partition_by=CreditScore.company_id,
+                    order_by=(CreditScore.calculated_at.desc(), CreditScore.id.desc())
+                ).label('rank')
+            ).subquery()
+            
+            columns = ['company_id', 'credit_score_id', 'overall_score', 'score_change',
+                       'trend_direction', 'calculated_at']
+            
+            self.db.query(LatestCreditScore).delete()
+            result = self.db.execute(
+                insert(LatestCreditScore).from_select(
+                    columns,
+                    select(*[ranked.c[column] for column in columns]).where(ranked.c.rank == 1)
+                )
+            )
+            self.db.commit()
+            
+            logger.info(f"Rebuilt latest credit scores for {result.rowcount} companies")
+            return result.rowcount
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error rebuilding latest credit scores: {e}")
+            raise
+    
+    def ensure_latest_scores(self):
+        """Populate the latest-score projection for databases scored before it existed"""
+        if self.db.query(LatestCreditScore).first() is None and self.db.query(CreditScore).first() is not None:
+            self.rebuild_latest_scores()
+    
     def get_latest_credit_score(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Get latest credit score for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
             
-            credit_score = self.db.query(CreditScore).filter(
-                CreditScore.company_id == company.id
-            ).order_by(CreditScore.calculated_at.desc()).first()
+            # Primary-key lookups through the latest-score projection
+            credit_score = self.db.query(CreditScore).join(
+                LatestCreditScore, LatestCreditScore.credit_score_id == CreditScore.id
+            ).filter(
+                LatestCreditScore.company_id == company.id
+            ).first()
             
             if not credit_score:
                 return None
             
             return {
                 'id': credit_score.id,
+                'company_id': company.id,
                 'ticker': ticker,
                 'company_name': company.name,
                 'overall_score': credit_score.overall_score,
@@ -498,6 +570,7 @@ class ScoringService:
                 'key_factors': credit_score.key_factors,
                 'risk_indicators': credit_score.risk_indicators,
                 'feature_importance': credit_score.feature_importance,
+                'score_breakdown': credit_score.score_breakdown,
                 'model_version': credit_score.model_version,
                 'confidence_level': credit_score.confidence_level,
                 'calculated_at': credit_score.calculated_at.isoformat(),
@@ -511,19 +584,29 @@ class ScoringService:
     def get_credit_score_history(self, ticker: str, days: int = 30) -> Optional[Dict[str, Any]]:
         """Get credit score history for a company"""
         try:
-            company = self.db.query(Company).filter(
-                Company.ticker == ticker.upper(),
-                Company.is_active == True
-            ).first()
+            company = company_cache.get(self.db, ticker)
             
             if not company:
                 return None
             
             cutoff_date = datetime.now() - timedelta(days=days)
-            scores = self.db.query(CreditScore).filter(
-                CreditScore.company_id == company.id,
-                CreditScore.calculated_at >= cutoff_date
-            ).order_by(CreditScore.calculated_at.asc()).all()
+            columns = [getattr(CreditScore, column) for column in HISTORY_COLUMNS]
+            scores = [
+                row._asdict() for row in self.db.query(*columns).filter(
+                    CreditScore.company_id == company.id,
+                    CreditScore.calculated_at >= cutoff_date
+                ).order_by(CreditScore.calculated_at.asc())
+            ]
+            
+            # Windows reaching past retention also read the archived scores of the company
+            archive = get_archive_store()
+            if archive and days > settings.credit_score_retention_days:
+                hot_ids = {score['id'] for score in scores}
+                archived = archive.read(CreditScore, 'calculated_at', HISTORY_COLUMNS, company.id, since=cutoff_date)
+                scores = sorted(
+                    scores + [score for score in archived if score['id'] not in hot_ids],
+                    key=lambda score: _naive(score['calculated_at'])
+                )
             
             if not scores:
                 return None
@@ -531,13 +614,13 @@ class ScoringService:
             score_history = []
             for score in scores:
                 score_dict = {
-                    'date': score.calculated_at.isoformat(),
-                    'overall_score': score.overall_score,
-                    'financial_score': score.financial_score,
-                    'market_score': score.market_score,
-                    'news_score': score.news_score,
-                    'score_change': score.score_change,
-                    'trend_direction': score.trend_direction
+                    'date': score['calculated_at'].isoformat(),
+                    'overall_score': score['overall_score'],
+                    'financial_score': score['financial_score'],
+                    'market_score': score['market_score'],
+                    'news_score': score['news_score'],
+                    'score_change': score['score_change'],
+                    'trend_direction': score['trend_direction']
                 }
                 score_history.append(score_dict)
             
@@ -676,21 +759,19 @@ class ScoringService:
     def get_leaderboard(self, limit: int = 10, sector: Optional[str] = None) -> Dict[str, Any]:
         """Get credit score leaderboard"""
         try:
-            # Build query
-            query = self.db.query(CreditScore, Company).join(Company).filter(
+            # Walk the projection's score index, highest first
+            query = self.db.query(LatestCreditScore, Company).join(
+                Company, Company.id == LatestCreditScore.company_id
+            ).filter(
                 Company.is_active == True
             )
             
             if sector:
                 query = query.filter(Company.sector == sector)
             
-            # Get latest scores for each company
-            latest_scores = query.order_by(
-                Company.id, CreditScore.calculated_at.desc()
-            ).distinct(Company.id).limit(limit).all()
-            
-            # Sort by score and create leaderboard
-            sorted_scores = sorted(latest_scores, key=lambda x: x[0].overall_score, reverse=True)
+            sorted_scores = query.order_by(
+                LatestCreditScore.overall_score.desc(), LatestCreditScore.company_id.desc()
+            ).limit(limit).all()
             
             entries = []
             for rank, (score, company) in enumerate(sorted_scores, 1):
@@ -717,5 +798,6 @@ class ScoringService:
             raise
 
 
-
-
+def _naive(value: datetime) -> datetime:
+    """Local naive datetime, so database and archived timestamps sort together"""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from app.models.sentiment_cache import SentimentCacheEntry
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.services.text_analyzers import ANALYSIS_VERSION
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_FIELDS = ['sentiment_score', 'sentiment_label', 'positive_score', 'negative_score', 'neutral_score']
+EVENT_FIELDS = ['event_type', 'event_confidence', 'keywords']
+
+# (sentiment_data, event_data) as produced by NewsService
+AnalysisResult = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+class SentimentCache:
+    """Two-tier cache (in-process LRU + sentiment_cache table) for article analysis results"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, AnalysisResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.database_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(text: str) -> str:
+        """Hash of the analysis version and the normalized (lowercased, whitespace-collapsed) text"""
+        normalized = re.sub(r'\s+', ' ', text.lower()).strip()
+        return hashlib.sha256(f"{ANALYSIS_VERSION}:{normalized}".encode('utf-8')).hexdigest()
+    
+    def get_many(self, db: Session, keys: List[str]) -> Dict[str, AnalysisResult]:
+        """Look up cached results, checking memory first and the database for the rest"""
+        found = {}
+        missing = []
+        
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                else:
+                    missing.append(key)
+            self.memory_hits += len(found)
+        
+        if missing:
+            try:
+                rows = db.query(SentimentCacheEntry).filter(
+                    SentimentCacheEntry.content_hash.in_(missing),
+                    SentimentCacheEntry.analysis_version == ANALYSIS_VERSION
+                ).all()
+            except Exception as e:
+                logger.error(f"Error reading sentiment cache: {e}")
+                rows = []
+            
+            for row in rows:
+                result = (
+                    {field: getattr(row, field) for field in SENTIMENT_FIELDS},
+                    {field: getattr(row, field) for field in EVENT_FIELDS}
+                )
+                found[row.content_hash] = result
+                self._remember(row.content_hash, result)
+            
+            with self._lock:
+                self.database_hits += len(rows)
+                self.misses += len(missing) - len(rows)
+        
+        return found
+    
+    def put_many(self, db: Session, results: Dict[str, AnalysisResult]):
+        """Store freshly computed results in memory and stage them in the caller's transaction"""
+        if not results:
+            return
+        
+        for key, result in results.items():
+            self._remember(key, result)
+        
+        try:
+            rows = [
+                {'content_hash': key, 'analysis_version': ANALYSIS_VERSION, **sentiment_data, **event_data}
+                for key, (sentiment_data, event_data) in results.items()
+            ]
+            # Savepoint so a failed cache write never aborts the caller's transaction
+            with db.begin_nested():
+                db.execute(
+                    dialect_insert(SentimentCacheEntry).on_conflict_do_nothing(index_elements=['content_hash']),
+                    rows
+                )
+                
+        except Exception as e:
+            logger.error(f"Error persisting sentiment cache entries: {e}")
+    
+    def _remember(self, key: str, result: AnalysisResult):
+        """Insert into the LRU, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and hit ratio"""
+        with self._lock:
+            hits = self.memory_hits + self.database_hits
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'database_hits': self.database_hits,
+                'misses': self.misses,
+                'hit_ratio': hits / lookups if lookups > 0 else 0.0,
+                'memory_entries': len(self._entries),
+                'memory_capacity': self.capacity
+            }
+
+
+# Process-wide cache shared by all NewsService instances
+sentiment_cache = SentimentCache(capacity=settings.sentiment_cache_size)
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import threading
+import time
+from importlib.metadata import version
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from app.core.keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+# Event classification keywords, matched as substrings of the lowercased article text
+EVENT_KEYWORDS = {
+    'default': ['default', 'bankruptcy', 'insolvency', 'liquidation', 'chapter 11'],
+    'merger': ['merger', 'acquisition', 'takeover', 'buyout', 'consolidation'],
+    'restructuring': ['restructuring', 'reorganization', 'layoffs', 'cost cutting'],
+    'earnings': ['earnings', 'profit', 'loss', 'quarterly results', 'financial results'],
+    'debt': ['debt', 'bond', 'credit rating', 'downgrade', 'upgrade'],
+    'legal': ['lawsuit', 'litigation', 'regulatory', 'investigation', 'fine'],
+    'management': ['ceo', 'executive', 'leadership', 'resignation', 'appointment']
+}
+
+# Bump when the sentiment or event classification code changes its results
+ANALYSIS_REVISION = 1
+
+# Identifies the analyzer setup; cached results from any other setup are ignored and pruned
+ANALYSIS_VERSION = hashlib.sha256(json.dumps(
+    [ANALYSIS_REVISION, version('vaderSentiment'), EVENT_KEYWORDS], sort_keys=True
+).encode('utf-8')).hexdigest()[:16]
+
+
+class AnalyzerRegistry:
+    """Process-wide text analyzers, each built once on first use and shared by all services"""
+    
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        self._factories = factories
+        self._instances: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name: str) -> Any:
+        """Get an analyzer, building it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        
+        with self._lock:
+            # Another thread may have built it while this one waited
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self._load_seconds[name] = time.perf_counter() - start
+                logger.info(f"Loaded {name} analyzer in {self._load_seconds[name]:.3f}s")
+            return self._instances[name]
+    
+    def warm_up(self):
+        """Build every analyzer now so no request pays for loading them"""
+        for name in self._factories:
+            self.get(name)
+    
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        """Load time in seconds of each analyzer, or None if not loaded yet"""
+        with self._lock:
+            return {name: self._load_seconds.get(name) for name in self._factories}
+
+
+# Process-wide registry shared by all services
+analyzers = AnalyzerRegistry({
+    'sentiment': SentimentIntensityAnalyzer,
+    'event_keywords': lambda: KeywordMatcher(EVENT_KEYWORDS)
+})
+
+
+def get_sentiment_analyzer() -> SentimentIntensityAnalyzer:
+    """Shared VADER analyzer; its lexicon is parsed once per process"""
+    return analyzers.get('sentiment')
+
+
+def get_event_matcher() -> KeywordMatcher:
+    """Shared compiled matcher for EVENT_KEYWORDS"""
+    return analyzers.get('event_keywords')
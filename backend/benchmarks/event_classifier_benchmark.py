@@ -0,0 +1,114 @@
+"""
+Micro-benchmark for news event classification.
+
+Compares the original per-keyword substring loop with the trie-regex scan and with
+KeywordMatcher as configured (which picks one of the two by vocabulary size) on a
+synthetic headline corpus and reports articles/sec for each. The legacy loop scans
+the text once per keyword, the trie regex once per article, so --scales also runs
+them against vocabularies padded with synthetic keywords per event type.
+
+Usage (from the backend directory):
+    python -m benchmarks.event_classifier_benchmark [--articles 100000] [--seed 42] [--repeat 3] [--scales 1,8,16]
+"""
+
+import argparse
+import random
+import string
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from app.core.keyword_matcher import KeywordMatcher
+from app.services.text_analyzers import EVENT_KEYWORDS
+
+FILLER_WORDS = [
+    'shares', 'company', 'market', 'investors', 'quarter', 'analysts', 'report', 'growth',
+    'stock', 'announced', 'today', 'sector', 'outlook', 'revenue', 'strategy', 'global',
+    'expects', 'guidance', 'trading', 'demand', 'supply', 'prices', 'update', 'plans'
+]
+
+
+def legacy_classify(text: str, event_keywords: Dict[str, Sequence[str]]) -> Tuple[List[str], List[str]]:
+    """The per-keyword substring loop previously used by NewsService._classify_events"""
+    text_lower = text.lower()
+    detected_events = []
+    keywords_found = []
+    
+    for event_type, keywords in event_keywords.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                detected_events.append(event_type)
+                keywords_found.append(keyword)
+                break
+    
+    return detected_events, keywords_found
+
+
+def build_vocabulary(scale: int, seed: int) -> Dict[str, List[str]]:
+    """Event keywords padded to `scale` times their size with synthetic lowercase keywords"""
+    rng = random.Random(seed)
+    vocabulary = {}
+    
+    for event_type, keywords in EVENT_KEYWORDS.items():
+        padding = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+            for _ in range(len(keywords) * (scale - 1))
+        ]
+        vocabulary[event_type] = list(keywords) + padding
+    
+    return vocabulary
+
+
+def build_corpus(size: int, seed: int, vocabulary: Dict[str, List[str]]) -> List[str]:
+    """Synthetic headlines with a description, about half of them mentioning event keywords"""
+    rng = random.Random(seed)
+    keywords = [keyword for group in vocabulary.values() for keyword in group]
+    corpus = []
+    
+    for _ in range(size):
+        words = rng.choices(FILLER_WORDS, k=rng.randint(20, 40))
+        for _ in range(rng.choice([0, 0, 1, 2, 3])):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords).title())
+        corpus.append(' '.join(words) + '.')
+    
+    return corpus
+
+
+def measure(name: str, classify: Callable[[str], Tuple[List[str], List[str]]], corpus: List[str],
+            repeat: int) -> list:
+    """Classify the corpus `repeat` times and print the best throughput"""
+    elapsed = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [classify(text) for text in corpus]
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"{name:<10} {len(corpus) / elapsed:>12,.0f} articles/sec  ({elapsed:.2f}s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per classifier; the best is reported")
+    parser.add_argument('--scales', default='1,8,16', help="comma-separated vocabulary size multipliers")
+    args = parser.parse_args()
+    
+    for scale in [int(value) for value in args.scales.split(',')]:
+        vocabulary = build_vocabulary(scale, args.seed)
+        corpus = build_corpus(args.articles, args.seed, vocabulary)
+        matcher = KeywordMatcher(vocabulary)
+        trie = KeywordMatcher(vocabulary, trie_min_keywords=0)
+        keyword_count = sum(len(group) for group in vocabulary.values())
+        
+        print(f"Classifying {len(corpus):,} synthetic articles against {keyword_count} keywords "
+              f"(matcher uses the {'trie regex' if matcher.pattern is not None else 'substring loop'})")
+        legacy = measure('legacy', lambda text: legacy_classify(text, vocabulary), corpus, args.repeat)
+        compiled = measure('trie', lambda text: trie.match(text.lower()), corpus, args.repeat)
+        selected = measure('matcher', lambda text: matcher.match(text.lower()), corpus, args.repeat)
+        
+        mismatches = sum(1 for old, new, chosen in zip(legacy, compiled, selected) if not old == new == chosen)
+        print(f"Mismatched classifications: {mismatches}\n")
+
+
+if __name__ == "__main__":
+    main()
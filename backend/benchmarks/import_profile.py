@@ -0,0 +1,96 @@
+"""
+Import-time profile of the API entry point.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and reports
+the total cold-start import time and the slowest top-level packages. Use it to
+spot cold-start regressions, e.g. a heavy ML library imported at module load.
+
+Usage (from the backend directory):
+    python -m benchmarks.import_profile [--top 15] [--budget-ms 2000] [--forbid xgboost,shap]
+
+Exits non-zero when the total exceeds --budget-ms or a forbidden module is imported.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries only the model-based scorer needs
+DEFAULT_FORBIDDEN = 'xgboost,shap,sklearn,matplotlib,seaborn,plotly'
+
+
+class ImportTiming(NamedTuple):
+    """One line of -X importtime output, times in microseconds"""
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def profile_imports(target: str = 'main') -> List[ImportTiming]:
+    """Import a module in a fresh interpreter and parse its -X importtime report"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append(ImportTiming(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us)
+        ))
+    
+    return timings
+
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    """Self time summed per top-level package"""
+    totals: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        totals[timing.module.split('.')[0]] += timing.self_us
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', default='main', help="module to import (default: main, which defines main:app)")
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, default=None, help="fail when total import time exceeds this")
+    parser.add_argument('--forbid', default=DEFAULT_FORBIDDEN, help="comma-separated modules that must not load")
+    args = parser.parse_args()
+    
+    timings = profile_imports(args.target)
+    total_ms = sum(timing.self_us for timing in timings) / 1000
+    packages = sorted(by_package(timings).items(), key=lambda item: item[1], reverse=True)
+    
+    print(f"Importing {args.target}: {total_ms:,.0f} ms across {len(timings)} modules\n")
+    print(f"{'package':<32} {'self ms':>10}")
+    for package, self_us in packages[:args.top]:
+        print(f"{package:<32} {self_us / 1000:>10,.1f}")
+    
+    failures = []
+    loaded = {timing.module for timing in timings}
+    for module in filter(None, args.forbid.split(',')):
+        if module in loaded:
+            failures.append(f"{module} is imported at startup")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"total import time {total_ms:,.0f} ms exceeds the {args.budget_ms:,.0f} ms budget")
+    
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
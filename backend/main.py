@@ -6,9 +6,15 @@ import logging
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, SessionLocal, upgrade_schema
 from app.api.routes import api_router
+from app.core.executors import shutdown_blocking_executor
+from app.core.http_client import close_http_client
+from app.services.partitions import ensure_partitions_ahead
+from app.services.query_audit import run_query_audit
+from app.services.scoring_service import ScoringService
 from app.services.scheduler import start_scheduler, stop_scheduler
+from app.services.text_analyzers import analyzers
 
 # Configure logging
 logging.basicConfig(
@@ -26,8 +32,24 @@ async def lifespan(app: FastAPI):
     
     # Create database tables
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+    ensure_partitions_ahead()
     logger.info("Database tables created")
     
+    # Backfill the latest-score projection on databases scored before it existed
+    db = SessionLocal()
+    try:
+        ScoringService(db).ensure_latest_scores()
+    finally:
+        db.close()
+    
+    # Load the VADER lexicon and compile the event matcher before the first request
+    analyzers.warm_up()
+    
+    # Report hot queries that fall back to sequential scans
+    if settings.query_audit_on_startup:
+        run_query_audit()
+    
     # Start scheduler for data ingestion
     start_scheduler()
     logger.info("Data ingestion scheduler started")
@@ -38,6 +60,10 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down News-Driven Credit Risk Monitor...")
     stop_scheduler()
     logger.info("Scheduler stopped")
+    
+    # Release pooled HTTP connections and worker threads
+    await close_http_client()
+    shutdown_blocking_executor()
 
 
 # Create FastAPI app
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+# Tests run against a throwaway SQLite database; set before the app reads its settings
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+import pytest
+
+from app.core.database import Base, SessionLocal, engine as app_engine
+from app.services.company_cache import company_cache
+from app.services.news_window import news_window
+
+
+@pytest.fixture
+def engine():
+    Base.metadata.drop_all(app_engine)
+    Base.metadata.create_all(app_engine)
+    yield app_engine
+
+
+@pytest.fixture
+def db(engine):
+    session = SessionLocal()
+    # Process-wide caches outlive the per-test tables; start every test with them empty
+    company_cache.invalidate()
+    news_window.invalidate()
+    yield session
+    session.close()
+    company_cache.invalidate()
+    news_window.invalidate()
@@ -0,0 +1,32 @@
+import pytest
+
+from app.core.keyword_matcher import KeywordMatcher
+from app.services.text_analyzers import EVENT_KEYWORDS
+
+TEXTS = [
+    "acme files for chapter 11 bankruptcy after debt downgrade",
+    "ceo resignation follows regulatory investigation and a record fine",
+    "quarterly results beat estimates",
+    "nothing to see here",
+    ""
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_substring_loop_and_trie_regex_agree(text):
+    loop = KeywordMatcher(EVENT_KEYWORDS)
+    trie = KeywordMatcher(EVENT_KEYWORDS, trie_min_keywords=0)
+    
+    assert loop.pattern is None
+    assert trie.pattern is not None
+    assert loop.match(text) == trie.match(text)
+    assert loop.find(text) == trie.find(text)
+
+
+def test_match_reports_first_listed_keyword_per_label():
+    matcher = KeywordMatcher(EVENT_KEYWORDS)
+    
+    labels, keywords = matcher.match(TEXTS[0])
+    
+    assert labels == ['default', 'debt']
+    assert keywords == ['bankruptcy', 'debt']
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from app.models import Company, CreditScore, FinancialData, NewsEvent
+from app.services.model_scoring import ModelTrainingService
+
+
+def test_training_labels_are_later_distress_events_not_stored_scores(db):
+    now = datetime(2024, 6, 1, 12)
+    acme = Company(ticker="ACME", name="Acme Corp", is_active=True)
+    globex = Company(ticker="GLBX", name="Globex", is_active=True)
+    db.add_all([acme, globex])
+    db.flush()
+    
+    observed = now - timedelta(days=100)
+    db.add_all([
+        # Two refreshes on the same day count as one observation
+        FinancialData(company_id=acme.id, date=observed - timedelta(hours=2), debt_to_equity=1.0),
+        FinancialData(company_id=acme.id, date=observed, debt_to_equity=2.0),
+        FinancialData(company_id=globex.id, date=observed, debt_to_equity=0.5),
+        # Horizon not yet elapsed: the outcome is unknown
+        FinancialData(company_id=acme.id, date=now - timedelta(days=10), debt_to_equity=3.0),
+        # Acme defaults within the horizon; Globex's default predates its observation
+        NewsEvent(company_id=acme.id, headline="Acme default", url="https://news.example/a",
+                  published_at=observed + timedelta(days=30), event_type="default", sentiment_score=-0.9),
+        NewsEvent(company_id=globex.id, headline="Globex default", url="https://news.example/g",
+                  published_at=observed - timedelta(days=2), event_type="default", sentiment_score=-0.9),
+        CreditScore(company_id=acme.id, overall_score=90.0, calculated_at=observed)
+    ])
+    db.commit()
+    
+    frame = ModelTrainingService(db).build_training_frame(horizon_days=90, now=now).set_index('company_id')
+    
+    assert 'overall_score' not in frame.columns
+    assert len(frame) == 2
+    assert frame.loc[acme.id, 'debt_to_equity'] == 2.0
+    assert frame.loc[acme.id, 'distress'] == 1.0
+    assert frame.loc[acme.id, 'news_article_count'] == 0
+    assert frame.loc[globex.id, 'distress'] == 0.0
+    assert frame.loc[globex.id, 'news_high_risk_count'] == 1
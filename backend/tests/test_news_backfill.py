@@ -0,0 +1,32 @@
+from app.models import Company, NewsEvent
+from app.schemas.news import NewsArticle
+from app.services.news_backfill import NewsBackfillService
+
+
+def article(title: str, url: str, **fields):
+    """A NewsAPI-format article as the backfill endpoint passes it on"""
+    return NewsArticle(title=title, url=url, publishedAt="2024-01-02T10:00:00Z", **fields).model_dump()
+
+
+def test_backfill_stores_articles_without_source(db):
+    db.add(Company(ticker="ACME", name="Acme Corp", is_active=True))
+    db.commit()
+    
+    articles = [
+        article("Acme beats earnings expectations", "https://news.example/1", source={"name": "Wire"}),
+        article("Acme faces lawsuit over patents", "https://news.example/2"),
+        article("Acme faces lawsuit over patents", "https://news.example/2")
+    ]
+    assert articles[1]['source'] is None
+    
+    stats = NewsBackfillService(db, workers=1, chunk_size=2).backfill("ACME", articles)
+    
+    assert stats['articles_received'] == 3
+    assert stats['articles_processed'] == 2
+    assert stats['articles_skipped'] == 1
+    
+    stored = {event.url: event for event in db.query(NewsEvent).all()}
+    assert set(stored) == {"https://news.example/1", "https://news.example/2"}
+    assert stored["https://news.example/1"].source == "Wire"
+    assert stored["https://news.example/2"].source is None
+    assert stored["https://news.example/2"].event_type == "legal"
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from app.core.database import upgrade_schema
+from app.models import Company, NewsEvent
+from app.models.news_event import article_url_hash
+from app.services.news_service import NewsService
+
+
+def article(title: str, url: str):
+    """A NewsAPI-format article"""
+    return {"title": title, "url": url, "publishedAt": "2024-01-02T10:00:00Z", "source": {"name": "Wire"}}
+
+
+def test_upgrade_backfills_url_hash_and_removes_duplicates(db, engine):
+    company = Company(ticker="ACME", name="Acme Corp", is_active=True)
+    db.add(company)
+    db.commit()
+    
+    # A table from before url_hash: no unique index and no hashes
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX uq_news_events_company_url_hash"))
+    published = datetime(2024, 1, 2)
+    db.add_all([
+        NewsEvent(company_id=company.id, headline="Acme beats", url="https://news.example/1", published_at=published),
+        NewsEvent(company_id=company.id, headline="Acme beats", url="https://news.example/1", published_at=published),
+        NewsEvent(company_id=company.id, headline="Acme sued", url=None, source="Wire", published_at=published)
+    ])
+    db.commit()
+    
+    upgrade_schema()
+    
+    events = db.query(NewsEvent).order_by(NewsEvent.id).all()
+    assert [event.id for event in events] == [1, 3]
+    assert events[0].url_hash == article_url_hash("https://news.example/1", None, None)
+    assert events[1].url_hash == article_url_hash(None, "Acme sued", "Wire")
+    assert "uq_news_events_company_url_hash" in {index["name"] for index in inspect(engine).get_indexes("news_events")}
+
+
+def test_store_articles_skips_stored_articles(db):
+    company = Company(ticker="ACME", name="Acme Corp", is_active=True)
+    db.add(company)
+    db.commit()
+    service = NewsService(db)
+    
+    first = service._store_articles("ACME", company.id, [article("Acme beats", "https://news.example/1")])
+    second = service._store_articles("ACME", company.id, [
+        article("Acme beats", "https://news.example/1"),
+        article("Acme sued", "https://news.example/2")
+    ])
+    
+    assert first["articles_processed"] == 1
+    assert second["articles_processed"] == 1
+    assert second["articles_skipped"] == 1
+    assert db.query(NewsEvent).count() == 2
+    
+    # The unique index turns a row that slips past the lookup into a skip, not an error
+    mapping = service._news_event_mapping(
+        company.id, article("Acme beats", "https://news.example/1"),
+        *service._analyze_articles([article("Acme beats", "https://news.example/1")])[0]
+    )
+    assert service._insert_news_events([mapping]) == 0
+    assert db.query(NewsEvent).count() == 2
@@ -0,0 +1,67 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app.core.query_counter import count_queries
+from app.models import Alert, Company, NewsEvent
+from app.services.alert_service import AlertService
+from app.services.news_service import NewsService
+
+# Read paths must run a fixed number of queries however many rows they return
+ROW_COUNTS = [1, 100]
+
+
+def seed(db, rows: int):
+    """Seed `rows` companies with one alert and one trending article each, plus `rows` alerts for ACME"""
+    now = datetime.now()
+    acme = Company(ticker="ACME", name="Acme Corp", is_active=True)
+    db.add(acme)
+    
+    for i in range(rows):
+        company = Company(ticker=f"C{i}", name=f"Company {i}", is_active=True)
+        db.add_all([
+            company,
+            Alert(company=company, alert_type="news_event", severity="high", title=f"Alert {i}", message="m"),
+            Alert(company=acme, alert_type="score_change", severity="medium", title=f"ACME alert {i}", message="m"),
+            NewsEvent(
+                company=company, headline=f"Headline {i}", url=f"https://news.example/{i}",
+                published_at=now - timedelta(hours=1), sentiment_score=-0.5, risk_score=0.8
+            )
+        ])
+    
+    db.commit()
+    # Later reads go to the database, not the identity map
+    db.expunge_all()
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_get_alerts_query_count(engine, db, rows):
+    seed(db, rows)
+    
+    with count_queries(engine) as queries:
+        alerts = AlertService(db).get_alerts(limit=rows * 2)
+    
+    assert len(alerts) == rows * 2
+    queries.assert_count(1)
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_get_company_alerts_query_count(engine, db, rows):
+    seed(db, rows)
+    
+    # Company lookup and the alerts query
+    with count_queries(engine) as queries:
+        alerts = AlertService(db).get_company_alerts("ACME")
+    
+    assert len(alerts) == rows
+    queries.assert_count(2)
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_get_trending_news_query_count(engine, db, rows):
+    seed(db, rows)
+    
+    with count_queries(engine) as queries:
+        result = NewsService(db).get_trending_news(limit=rows)
+    
+    assert result['total_articles'] == rows
+    queries.assert_count(1)
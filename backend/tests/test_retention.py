@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from app.models import SentimentCacheEntry
+from app.services.retention import RetentionPolicy, RetentionService
+from app.services.sentiment_cache import sentiment_cache
+from app.services.text_analyzers import ANALYSIS_VERSION
+
+
+def test_retention_prunes_expired_and_stale_sentiment_cache(db):
+    now = datetime.now()
+    db.add_all([
+        SentimentCacheEntry(content_hash="fresh", analysis_version=ANALYSIS_VERSION, created_at=now),
+        SentimentCacheEntry(content_hash="expired", analysis_version=ANALYSIS_VERSION, created_at=now - timedelta(days=40)),
+        SentimentCacheEntry(content_hash="other-setup", analysis_version="0" * 16, created_at=now),
+        SentimentCacheEntry(content_hash="unversioned", analysis_version=None, created_at=now)
+    ])
+    db.commit()
+    
+    policy = RetentionPolicy(SentimentCacheEntry, 'created_at', 30, archived=False)
+    stats = RetentionService(db, batch_size=2, batch_pause=0).run(policies=[policy], vacuum=False)
+    
+    assert stats['tables']['sentiment_cache']['rows_deleted'] == 3
+    assert [entry.content_hash for entry in db.query(SentimentCacheEntry).all()] == ["fresh"]
+
+
+def test_sentiment_cache_ignores_results_of_another_setup(db):
+    key = sentiment_cache.key("Acme  beats earnings")
+    assert key == sentiment_cache.key("acme beats earnings")
+    
+    db.add(SentimentCacheEntry(content_hash=key, analysis_version="0" * 16, sentiment_label="positive"))
+    db.commit()
+    
+    assert sentiment_cache.get_many(db, [key]) == {}
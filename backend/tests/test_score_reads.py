@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+
+from app.models import Company, CreditScore, LatestCreditScore
+from app.services.scoring_service import ScoringService
+from main import app
+
+EXPLANATION = {'explanation_summary': "Stable", 'key_factors': [], 'risk_indicators': []}
+
+
+def save_score(service: ScoringService, overall_score: float):
+    """Save a score for ACME with placeholder components"""
+    service._save_credit_score(
+        "ACME", overall_score, overall_score, overall_score, overall_score,
+        0.0, "stable", 0.0, EXPLANATION, {}
+    )
+
+
+def add_company(db) -> Company:
+    """Store the ACME company"""
+    company = Company(ticker="ACME", name="Acme Corp", is_active=True)
+    db.add(company)
+    db.commit()
+    return company
+
+
+def test_latest_score_projection_ignores_older_scores(db):
+    company = add_company(db)
+    service = ScoringService(db)
+    save_score(service, 70.0)
+    latest = db.query(LatestCreditScore).one()
+    
+    # A score computed before the stored one, committed after it
+    stale = CreditScore(company_id=company.id, overall_score=20.0, calculated_at=latest.calculated_at - timedelta(hours=1))
+    db.add(stale)
+    db.flush()
+    service._upsert_latest_scores([{
+        'company_id': company.id, 'credit_score_id': stale.id, 'overall_score': 20.0,
+        'score_change': 0.0, 'trend_direction': "stable", 'calculated_at': stale.calculated_at
+    }])
+    db.commit()
+    db.expire_all()
+    
+    assert db.query(LatestCreditScore).one().overall_score == 70.0
+    
+    save_score(service, 65.0)
+    db.expire_all()
+    assert db.query(LatestCreditScore).one().overall_score == 65.0
+
+
+def test_score_endpoint_revalidates_with_etag(db):
+    add_company(db)
+    service = ScoringService(db)
+    save_score(service, 70.0)
+    client = TestClient(app)
+    
+    response = client.get("/api/v1/scoring/score/ACME")
+    assert response.status_code == 200
+    assert response.json()['overall_score'] == 70.0
+    etag = response.headers['ETag']
+    
+    response = client.get("/api/v1/scoring/score/ACME", headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    
+    # A new score invalidates the cached response and its tag
+    save_score(service, 40.0)
+    response = client.get("/api/v1/scoring/score/ACME", headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json()['overall_score'] == 40.0
+    assert response.headers['ETag'] != etag
@@ -0,0 +1,30 @@
+from app.models import Alert, Company
+from app.services.scoring_service import ScoringService
+
+EXPLANATION = {'explanation_summary': "", 'key_factors': [], 'risk_indicators': []}
+
+
+def save_score(service: ScoringService, overall_score: float):
+    """Save a score for ACME with placeholder components"""
+    service._save_credit_score(
+        "ACME", overall_score, overall_score, overall_score, overall_score,
+        0.0, "stable", 0.0, EXPLANATION, {}
+    )
+
+
+def test_single_ticker_scoring_alerts_on_large_moves(db):
+    db.add(Company(ticker="ACME", name="Acme Corp", is_active=True))
+    db.commit()
+    service = ScoringService(db)
+    
+    save_score(service, 70.0)
+    assert db.query(Alert).count() == 0
+    
+    save_score(service, 71.0)
+    assert db.query(Alert).count() == 0
+    
+    save_score(service, 40.0)
+    alert = db.query(Alert).one()
+    assert alert.alert_type == "score_change"
+    assert alert.severity == "critical"
+    assert (alert.previous_score, alert.current_score) == (71.0, 40.0)